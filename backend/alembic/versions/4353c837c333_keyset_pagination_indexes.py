@@ -0,0 +1,46 @@
+"""Keyset pagination indexes on reservation, application and message
+
+Revision ID: 4353c837c333
+Revises: 9fb7635303eb
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4353c837c333'
+down_revision: Union[str, None] = '9fb7635303eb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The initial revision created message without branch_key although the model has always had it
+    message_columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('message')}
+    if 'branch_key' not in message_columns:
+        op.add_column('message', sa.Column('branch_key', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default=''))
+        op.alter_column('message', 'branch_key', server_default=None)
+        op.create_index(op.f('ix_message_branch_key'), 'message', ['branch_key'], unique=False)
+
+    # (branch_key, ts, id) serves branch admins, (ts, id) serves superusers; both scanned backwards
+    op.create_index('ix_reservation_branch_key_received_at_id', 'reservation', ['branch_key', 'received_at', 'id'], unique=False)
+    op.create_index('ix_reservation_received_at_id', 'reservation', ['received_at', 'id'], unique=False)
+    op.create_index('ix_application_branch_key_submitted_at_id', 'application', ['branch_key', 'submitted_at', 'id'], unique=False)
+    op.create_index('ix_application_submitted_at_id', 'application', ['submitted_at', 'id'], unique=False)
+    op.create_index('ix_message_branch_key_received_at_id', 'message', ['branch_key', 'received_at', 'id'], unique=False)
+    op.create_index('ix_message_received_at_id', 'message', ['received_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    # message.branch_key is left in place: the model needs it, whichever revision added it
+    op.drop_index('ix_message_received_at_id', table_name='message')
+    op.drop_index('ix_message_branch_key_received_at_id', table_name='message')
+    op.drop_index('ix_application_submitted_at_id', table_name='application')
+    op.drop_index('ix_application_branch_key_submitted_at_id', table_name='application')
+    op.drop_index('ix_reservation_received_at_id', table_name='reservation')
+    op.drop_index('ix_reservation_branch_key_received_at_id', table_name='reservation')
@@ -0,0 +1,52 @@
+"""branch_id foreign key on reservation, application and message
+
+Revision ID: 71bef32d0c16
+Revises: 4353c837c333
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '71bef32d0c16'
+down_revision: Union[str, None] = '4353c837c333'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> timestamp column of its keyset pagination index
+TABLES = {
+    'reservation': 'received_at',
+    'application': 'submitted_at',
+    'message': 'received_at',
+}
+
+
+def upgrade() -> None:
+    for table, timestamp in TABLES.items():
+        op.add_column(table, sa.Column('branch_id', sa.Integer(), nullable=True))
+        # Rows whose branch_key matches no branch slug keep branch_id NULL
+        op.execute(
+            f"""
+            UPDATE {table}
+            SET branch_id = (
+                SELECT branchsetting.id FROM branchsetting WHERE branchsetting.slug = {table}.branch_key
+            )
+            """
+        )
+        op.create_foreign_key(f'{table}_branch_id_fkey', table, 'branchsetting', ['branch_id'], ['id'])
+        # The (branch_id, ts, id) index also serves plain branch_id lookups
+        op.create_index(f'ix_{table}_branch_id_{timestamp}_id', table, ['branch_id', timestamp, 'id'], unique=False)
+        op.drop_index(f'ix_{table}_branch_key_{timestamp}_id', table_name=table)
+
+
+def downgrade() -> None:
+    for table, timestamp in TABLES.items():
+        op.create_index(f'ix_{table}_branch_key_{timestamp}_id', table, ['branch_key', timestamp, 'id'], unique=False)
+        op.drop_index(f'ix_{table}_branch_id_{timestamp}_id', table_name=table)
+        op.drop_constraint(f'{table}_branch_id_fkey', table, type_='foreignkey')
+        op.drop_column(table, 'branch_id')
@@ -0,0 +1,50 @@
+"""Unique constraint on managedtable (branch_id, table_number)
+
+Revision ID: 9fb7635303eb
+Revises: ccb7ce9af28f
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9fb7635303eb'
+down_revision: Union[str, None] = 'ccb7ce9af28f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Duplicated (branch_id, table_number) pairs would make the constraint fail; which row is the
+    # real table (QR codes are printed with its link) is for an operator to decide, so stop and list them
+    duplicates = op.get_bind().execute(sa.text(
+        """
+        SELECT branch_id, table_number, COUNT(*) AS copies, MIN(id) AS first_id, MAX(id) AS last_id
+        FROM managedtable
+        GROUP BY branch_id, table_number
+        HAVING COUNT(*) > 1
+        ORDER BY branch_id, table_number
+        """
+    )).all()
+    if duplicates:
+        listing = "\n".join(
+            f"  branch_id={row.branch_id} table_number={row.table_number}: {row.copies} rows (ids {row.first_id}..{row.last_id})"
+            for row in duplicates
+        )
+        raise RuntimeError(
+            "managedtable has duplicate (branch_id, table_number) rows; delete or renumber them, then re-run the upgrade:\n"
+            + listing
+        )
+    op.create_unique_constraint('uq_managedtable_branch_id_table_number', 'managedtable', ['branch_id', 'table_number'])
+    # The unique constraint's index covers the same columns
+    op.drop_index('ix_managedtable_branch_id_table_number', table_name='managedtable')
+
+
+def downgrade() -> None:
+    op.create_index('ix_managedtable_branch_id_table_number', 'managedtable', ['branch_id', 'table_number'], unique=False)
+    op.drop_constraint('uq_managedtable_branch_id_table_number', 'managedtable', type_='unique')
@@ -0,0 +1,43 @@
+"""reservation capacity on branchsetting and the reservationslot counter table
+
+Revision ID: c5d2e8a14f63
+Revises: 71bef32d0c16
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d2e8a14f63'
+down_revision: Union[str, None] = '71bef32d0c16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Capacity NULL = not limited, so existing branches keep accepting everything and need no counters
+    op.add_column('branchsetting', sa.Column('reservation_capacity', sa.Integer(), nullable=True))
+    op.add_column('branchsetting', sa.Column('reservation_slot_minutes', sa.Integer(), nullable=False, server_default='30'))
+    op.add_column('branchsetting', sa.Column('reservation_opens_at', sa.Time(), nullable=False, server_default='12:00:00'))
+    op.add_column('branchsetting', sa.Column('reservation_last_slot_at', sa.Time(), nullable=False, server_default='22:00:00'))
+    op.create_table('reservationslot',
+    sa.Column('branch_id', sa.Integer(), nullable=False),
+    sa.Column('slot_date', sa.Date(), nullable=False),
+    sa.Column('slot_time', sa.Time(), nullable=False),
+    sa.Column('booked_guests', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['branch_id'], ['branchsetting.id'], ),
+    sa.PrimaryKeyConstraint('branch_id', 'slot_date', 'slot_time')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('reservationslot')
+    op.drop_column('branchsetting', 'reservation_last_slot_at')
+    op.drop_column('branchsetting', 'reservation_opens_at')
+    op.drop_column('branchsetting', 'reservation_slot_minutes')
+    op.drop_column('branchsetting', 'reservation_capacity')
@@ -0,0 +1,28 @@
+"""Composite index on managedtable (branch_id, table_number)
+
+Revision ID: ccb7ce9af28f
+Revises: 9378d3bfd7d7
+Create Date: 2026-10-17 11:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ccb7ce9af28f'
+down_revision: Union[str, None] = '9378d3bfd7d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the joined (slug, table_number) lookup of the public QR view
+    op.create_index('ix_managedtable_branch_id_table_number', 'managedtable', ['branch_id', 'table_number'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_managedtable_branch_id_table_number', table_name='managedtable')
@@ -6,8 +6,9 @@ from sqlmodel import Session
 
 from app import crud, models, schemas
 from app.core import security
+from app.core.cache import user_principal_cache
 from app.core.config import settings
-from app.db.session import SessionLocal, get_db # Import get_db from session
+from app.db.session import SessionLocal, get_db, get_async_db # Import get_db from session
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
@@ -16,28 +17,36 @@ reusable_oauth2 = OAuth2PasswordBearer(
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(reusable_oauth2)
-) -> Optional[models.User]:
+) -> schemas.UserPrincipal:
     token_data = security.decode_token(token)
-    if not token_data:
+    # Refresh tokens are only accepted by /auth/refresh
+    if not token_data or token_data.type == "refresh":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials (invalid token)",
         )
-    user = crud.user.get(db, id=int(token_data.sub))
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user_id = int(token_data.sub)
+    # Cache hit: no query (the session only connects on first use)
+    user = user_principal_cache.get(user_id)
+    if user is None:
+        # Read before the query: a user update invalidating principals meanwhile makes the result uncacheable
+        generation = user_principal_cache.generation
+        user = crud.user.get_principal(db, id=user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        user_principal_cache.set_if_generation(user_id, user, generation)
     return user
 
 def get_current_active_user(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: schemas.UserPrincipal = Depends(get_current_user),
+) -> schemas.UserPrincipal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 def get_current_active_superuser(
-    current_user: models.User = Depends(get_current_active_user),
-) -> models.User:
+    current_user: schemas.UserPrincipal = Depends(get_current_active_user),
+) -> schemas.UserPrincipal:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
@@ -48,7 +57,7 @@ def get_current_active_superuser(
 def get_branch_access_dependency(
     branch_id: Union[int, str] = Path(...),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(get_current_active_user)
 ) -> models.BranchSetting:
     # Check if superuser (can access all)
     if current_user.is_superuser:
@@ -57,6 +66,13 @@ def get_branch_access_dependency(
             raise HTTPException(status_code=404, detail="Branch not found")
         return branch
 
+    # Reject other branches (by id or slug) from the principal alone, before any query
+    if current_user.branch_id is None or str(branch_id) not in (str(current_user.branch_id), current_user.branch_slug):
+        raise HTTPException(
+            status_code=403,
+            detail="User does not have access to this branch"
+        )
+
     # Check if user is assigned to this branch
     branch = crud.branch.get_by_id_or_slug(db, id_or_slug=branch_id)
     if not branch:
@@ -71,7 +87,7 @@ def get_branch_access_dependency(
 
 # Dependency to get the current user's branch ID (or None if superuser)
 def get_optional_user_branch_id(
-    current_user: models.User = Depends(get_current_active_user)
+    current_user: schemas.UserPrincipal = Depends(get_current_active_user)
 ) -> Optional[int]:
     if current_user.is_superuser:
         return None
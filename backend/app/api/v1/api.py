@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 
 # Import endpoint routers here
-from .endpoints import auth, users, branches, tables, reservations, applications, messages, view
+from .endpoints import auth, users, branches, tables, reservations, applications, messages, view, monitoring
 
 api_router = APIRouter()
 
@@ -18,6 +18,7 @@ admin_router.include_router(tables.router, prefix="/tables", tags=["Table Manage
 admin_router.include_router(reservations.router, prefix="/reservations", tags=["Reservations (Admin)"])
 admin_router.include_router(applications.router, prefix="/applications", tags=["Applications (Admin)"])
 admin_router.include_router(messages.router, prefix="/messages", tags=["Messages (Admin)"])
+admin_router.include_router(monitoring.router, prefix="/monitoring", tags=["Monitoring (Admin)"])
 
 # Include the admin router under the /admin prefix
 api_router.include_router(admin_router, prefix="/admin")
@@ -1,150 +1,226 @@
 from typing import Any, List
 from typing import Optional
-import shutil
-import os
 from pathlib import Path
-from datetime import datetime # Need datetime for filename
+from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
 from app.core.config import settings
+from app.db.write_behind import get_write_behind
+from app.storage import Storage, get_cv_storage
+from app.utils.http import PathSendFileResponse, http_date, is_not_modified, make_etag, parse_byte_range
+from app.utils.uploads import stream_cv_upload
 
-# Define a directory to store CVs (consider security and volume mapping in Docker)
-# Ensure this path is accessible within the container and ideally mapped to a persistent volume
-UPLOAD_DIRECTORY = Path("/app/uploads/cv")
-UPLOAD_DIRECTORY.mkdir(parents=True, exist_ok=True)
+# CVs live in the storage backend selected by CV_STORAGE_BACKEND (see app.storage);
+# Application.cv_file_path holds the storage key
+MAX_CV_FILE_SIZE = 5 * 1024 * 1024 # 5 MB
 
 router = APIRouter()
 
 
 # POST endpoint is public, handles file upload
-@router.post("/", response_model=schemas.ApplicationRead, status_code=status.HTTP_201_CREATED)
-def create_application(
-    *, # Keyword-only arguments
-    db: Session = Depends(deps.get_db),
-    # Receive form data using Form()
-    name: str = Form(...),
-    email: str = Form(...),
-    phone: str = Form(...),
-    birthdate: str = Form(...), # Receive as string, Pydantic will parse to date
-    branch_key: str = Form(...),
-    department: str = Form(...),
-    experience_years: int = Form(...),
-    message: Optional[str] = Form(None),
-    privacy_policy_accepted: bool = Form(...),
-    cv_file: UploadFile = File(...),
+# The body is parsed by hand (streamed to disk), so its schema is declared here for the docs
+APPLICATION_FORM_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": [
+                        "name", "email", "phone", "birthdate", "branch_key", "department",
+                        "experience_years", "privacy_policy_accepted", "cv_file",
+                    ],
+                    "properties": {
+                        "name": {"type": "string"},
+                        "email": {"type": "string", "format": "email"},
+                        "phone": {"type": "string"},
+                        "birthdate": {"type": "string", "format": "date"},
+                        "branch_key": {"type": "string"},
+                        "department": {"type": "string"},
+                        "experience_years": {"type": "integer"},
+                        "message": {"type": "string"},
+                        "privacy_policy_accepted": {"type": "boolean"},
+                        "cv_file": {"type": "string", "format": "binary", "description": "PDF, DOCX or DOC, max 5MB"},
+                    },
+                }
+            }
+        },
+    }
+}
+
+@router.post(
+    "/",
+    response_model=schemas.ApplicationRead,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=APPLICATION_FORM_OPENAPI,
+    responses={202: {"model": schemas.SubmissionReceipt, "description": "Accepted for a later write (write-behind mode)"}},
+)
+async def create_application(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    storage: Storage = Depends(get_cv_storage),
 ) -> Any:
     """
     Create new application. Public access.
-    Handles CV file upload.
+    The CV is streamed straight into storage: the type is checked from its magic bytes
+    and the upload is aborted as soon as it exceeds MAX_CV_FILE_SIZE.
+    With WRITE_BEHIND_ENABLED the row is journaled (the CV is already stored) and a 202 receipt is returned.
     """
-    # Basic validation for file type (optional but recommended)
-    if cv_file.content_type not in ["application/pdf", "application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]:
-        raise HTTPException(status_code=400, detail="Invalid file type. Only PDF and Word documents are allowed.")
-
-    # Basic validation for file size (optional but recommended)
-    MAX_FILE_SIZE = 5 * 1024 * 1024 # 5 MB
-    size = cv_file.size
-    if size > MAX_FILE_SIZE:
-         raise HTTPException(status_code=413, detail="File size exceeds the limit of 5MB.")
-
-    # Create the ApplicationCreate schema from form data
-    application_in = schemas.ApplicationCreate(
-        name=name, email=email, phone=phone, birthdate=birthdate, 
-        branch_key=branch_key, department=department, 
-        experience_years=experience_years, message=message, 
-        privacy_policy_accepted=privacy_policy_accepted
+    upload = await stream_cv_upload(
+        request, file_field="cv_file", storage=storage, max_file_size=MAX_CV_FILE_SIZE
     )
+    if upload.file_key is None:
+        raise HTTPException(status_code=400, detail="A CV file (cv_file) is required.")
 
-    # Sanitize filename and create a unique path
-    # Avoid using user-provided filename directly
-    file_extension = Path(cv_file.filename).suffix
-    # Create a more robust unique naming convention (e.g., using UUID)
-    # For simplicity, using email and timestamp here (ensure email is valid first)
-    safe_email = application_in.email.replace("@", "_").replace(".", "_")
-    unique_filename = f"{safe_email}_{int(datetime.now().timestamp())}{file_extension}"
-    file_path = UPLOAD_DIRECTORY / unique_filename
-
-    # Save the file
+    journal = get_write_behind()
+    receipt = None
     try:
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(cv_file.file, buffer)
-    except Exception as e:
-        # Log the error
-        print(f"Error saving file: {e}")
-        raise HTTPException(status_code=500, detail="Could not save CV file.")
-    finally:
-        cv_file.file.close() # Ensure the file is closed
-
-    # Create application entry in DB
-    application_obj = crud.application.create_with_cv_path(
-        db=db, obj_in=application_in, cv_file_path=str(file_path)
-    )
-    
+        application_in = schemas.ApplicationCreate(**upload.fields)
+        if journal is not None:
+            application_obj = await crud.async_application.build_with_cv_path(
+                db=db, obj_in=application_in, cv_file_path=upload.file_key
+            )
+            if application_obj:
+                receipt = await journal.enqueue(application_obj)
+        else:
+            # Create application entry in DB
+            application_obj = await crud.async_application.create_with_cv_path(
+                db=db, obj_in=application_in, cv_file_path=upload.file_key
+            )
+    except ValidationError as e:
+        await storage.delete(upload.file_key)
+        raise RequestValidationError(e.errors(include_url=False))
+    except BaseException:
+        await storage.delete(upload.file_key)
+        raise
+
     if not application_obj:
         # Clean up saved file if DB entry fails
-        if file_path.exists():
-            file_path.unlink()
+        await storage.delete(upload.file_key)
         raise HTTPException(
             status_code=400,
             detail="Invalid branch key provided.",
         )
 
+    if receipt is not None:
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(receipt))
     return application_obj
 
 # GET endpoint requires authentication and filters by user's branch
 @router.get("/", response_model=List[schemas.ApplicationRead])
 def read_applications(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve applications for the user's branch (or all for superuser).
     Requires authentication.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
     user_branch_id = None if current_user.is_superuser else current_user.branch_id
-    applications = crud.application.get_multi_by_branch(
-        db, branch_id=user_branch_id, skip=skip, limit=limit
-    )
+    try:
+        applications = crud.application.get_multi_by_branch(
+            db, branch_id=user_branch_id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    next_cursor = crud.application.next_cursor(applications, limit=limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return applications
 
 # GET endpoint to download CV requires authentication and checks ownership
-@router.get("/cv/{application_id}")#, response_class=FileResponse)
-def download_cv(
+@router.get("/cv/{application_id}")
+async def download_cv(
     *, # Keyword-only arguments
-    db: Session = Depends(deps.get_db),
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    storage: Storage = Depends(get_cv_storage),
     application_id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Download the CV file for a specific application.
     Requires authentication and ensures the user has access to the application's branch.
+    Supports conditional requests (ETag / Last-Modified -> 304) and single byte ranges (206).
+    Local files are handed to the server for sendfile where it supports it.
     """
-    db_application = crud.application.get(db, id=application_id)
-    if not db_application:
+    # One query; the user's branch comes from the cached principal
+    location = await crud.async_application.get_cv_location(db, id=application_id)
+    if not location:
         raise HTTPException(status_code=404, detail="Application not found")
+    key, application_branch_id = location
 
     # Authorization check
     if not current_user.is_superuser:
         if not current_user.branch_id:
              raise HTTPException(status_code=403, detail="User is not assigned to a branch")
-        # Check if application's branch_key matches user's branch slug
-        branch = crud.branch.get(db, id=current_user.branch_id)
-        if not branch or db_application.branch_key != branch.slug:
+        if application_branch_id != current_user.branch_id:
             raise HTTPException(status_code=403, detail="Not authorized to access this CV")
 
-    cv_path = Path(db_application.cv_file_path)
-    if not cv_path.is_file():
-        # Log this error - indicates missing file or incorrect path in DB
-        print(f"CV file not found at path: {cv_path}")
+    stored = await storage.stat(key)
+    if stored is None:
+        # Log this error - indicates missing file or incorrect key in DB
+        print(f"CV file not found in storage: {key}")
         raise HTTPException(status_code=404, detail="CV file not found on server")
 
-    # Return file response
-    # Use filename from the path, or generate a more user-friendly one
-    return FileResponse(path=cv_path, filename=cv_path.name, media_type='application/octet-stream') 
\ No newline at end of file
+    filename = key.rsplit("/", 1)[-1]
+    etag = make_etag(f"{key}:{stored.size}:{stored.last_modified.timestamp()}".encode())
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stored.last_modified),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache", # Personal data: browsers may keep it but must revalidate
+    }
+    if is_not_modified(request.headers, etag, stored.last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    local_path = storage.local_path(key)
+    if local_path is not None:
+        if settings.CV_X_ACCEL_REDIRECT_PREFIX:
+            relative = local_path.relative_to(Path(settings.CV_STORAGE_LOCAL_DIR).resolve())
+            headers["X-Accel-Redirect"] = settings.CV_X_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(relative.as_posix())
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return Response(media_type="application/octet-stream", headers=headers)
+        # Handles Range / If-Range itself
+        return PathSendFileResponse(
+            local_path, filename=filename, media_type="application/octet-stream", headers=headers
+        )
+
+    # Remote backend: ranges are forwarded to the storage
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", etag) in (etag, headers["Last-Modified"]):
+        try:
+            byte_range = parse_byte_range(range_header, stored.size)
+        except ValueError:
+            return Response(
+                status_code=416,
+                headers={"Content-Range": f"bytes */{stored.size}"},
+            )
+    if byte_range is None:
+        headers["Content-Length"] = str(stored.size)
+        return StreamingResponse(storage.stream_get(key), media_type="application/octet-stream", headers=headers)
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{stored.size}"
+    return StreamingResponse(
+        storage.stream_get(key, start=start, end=end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type="application/octet-stream",
+        headers=headers,
+    )
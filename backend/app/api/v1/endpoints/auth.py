@@ -53,7 +53,7 @@ def refresh_access_token(
     Get a new access token from a refresh token.
     """
     token_payload = security.decode_token(refresh_token_data.refresh_token)
-    if not token_payload or token_payload.get("type") != "refresh":
+    if not token_payload or token_payload.type != "refresh":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
@@ -77,7 +77,7 @@ def refresh_access_token(
 
 @router.get("/me", response_model=schemas.UserRead)
 def read_users_me(
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get current user.
@@ -14,7 +14,7 @@ def read_branches(
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve branch settings. 
@@ -70,7 +70,7 @@ def create_branch(
     *, 
     db: Session = Depends(deps.get_db),
     branch_in: schemas.BranchSettingCreate,
-    current_user: models.User = Depends(deps.get_current_active_superuser)
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_superuser)
 ) -> Any:
     """
     Create new branch. Superuser only.
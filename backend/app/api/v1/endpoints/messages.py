@@ -1,39 +1,57 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
+from app.db.write_behind import get_write_behind
 
 router = APIRouter()
 
 
 # POST endpoint is public
-@router.post("/", response_model=schemas.MessageRead, status_code=status.HTTP_201_CREATED)
-def create_message(
+@router.post(
+    "/",
+    response_model=schemas.MessageRead,
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {"model": schemas.SubmissionReceipt, "description": "Accepted for a later write (write-behind mode)"}},
+)
+async def create_message(
     *, # Keyword-only arguments
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     message_in: schemas.MessageCreate,
 ) -> Any:
     """
     Create new message. Public access.
+    With WRITE_BEHIND_ENABLED the message is journaled and a 202 receipt is returned instead.
     """
-    message_obj = crud.message.create(db=db, obj_in=message_in)
+    journal = get_write_behind()
+    if journal is not None:
+        receipt = await journal.enqueue(await crud.async_message.build(db=db, obj_in=message_in))
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(receipt))
+
+    message_obj = await crud.async_message.create(db=db, obj_in=message_in)
     return message_obj
 
 # GET endpoint requires authentication (any active admin can see)
 @router.get("/", response_model=List[schemas.MessageRead])
 def read_messages(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user), # Ensures user is active
+    cursor: Optional[str] = None,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_user), # Ensures user is active
 ) -> Any:
     """
     Retrieve messages.
     Requires authentication.
     Filters messages by the user's assigned branch if the user is not a superuser.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
     user_branch_id = None
     if not current_user.is_superuser:
@@ -42,10 +60,17 @@ def read_messages(
              # If a non-superuser is not assigned to a branch, they see nothing
              return [] 
 
-    messages = crud.message.get_multi(
-        db,
-        branch_id=user_branch_id, # Pass branch_id for filtering
-        skip=skip, 
-        limit=limit
-    )
+    try:
+        messages = crud.message.get_multi(
+            db,
+            branch_id=user_branch_id, # Pass branch_id for filtering
+            skip=skip, 
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    next_cursor = crud.message.next_cursor(messages, limit=limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return messages 
\ No newline at end of file
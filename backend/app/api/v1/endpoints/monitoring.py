@@ -0,0 +1,60 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app import schemas
+from app.api import deps
+from app.core.branch_registry import branch_registry
+from app.core.security import password_hash_stats
+from app.db.pool import pool_status
+from app.db.session import async_engine, engine
+from app.db.write_behind import get_write_behind
+
+router = APIRouter()
+
+
+@router.get("/pool")
+def read_pool_stats(
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Connection pool gauges and counters for this worker (sync and async engines).
+    Superuser only. Use peak_checked_out, overflow and wait buckets to size DB_POOL_SIZE / DB_MAX_OVERFLOW.
+    """
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+    }
+
+
+@router.get("/password-hashing")
+def read_password_hashing_stats(
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    bcrypt process pool usage for this worker. Superuser only.
+    in_flight/peak_in_flight include queued hashes; rejected counts 503s from a full queue.
+    """
+    return password_hash_stats.snapshot()
+
+
+@router.get("/write-behind")
+async def read_write_behind_stats(
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Write-behind journal for public submissions. Superuser only.
+    pending is shared by the workers of the host; dead rows were refused by the database and need a look.
+    """
+    journal = get_write_behind()
+    if journal is None:
+        raise HTTPException(status_code=404, detail="Write-behind is disabled.")
+    return await journal.snapshot()
+
+
+@router.get("/branch-registry")
+def read_branch_registry_stats(
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """In-memory branch registry of this worker (branch key validation). Superuser only."""
+    return branch_registry.info()
@@ -1,24 +1,58 @@
-from typing import Any, List
+from datetime import date
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps
+from app.crud.crud_reservation_slot import SlotClosedError, SlotFullError
+from app.db.write_behind import get_write_behind
+from app.utils.slots import slot_times
 
 router = APIRouter()
 
 # POST endpoint is public
-@router.post("/", response_model=schemas.ReservationRead, status_code=status.HTTP_201_CREATED)
-def create_reservation(
+@router.post(
+    "/",
+    response_model=schemas.ReservationRead,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        202: {"model": schemas.SubmissionReceipt, "description": "Accepted for a later write (write-behind mode)"},
+        409: {"description": "The time slot has no room left for this many guests"},
+    },
+)
+async def create_reservation(
     *, # Keyword-only arguments
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     reservation_in: schemas.ReservationCreate,
 ) -> Any:
     """
     Create new reservation. Public access.
+    With WRITE_BEHIND_ENABLED the reservation is journaled and a 202 receipt is returned instead,
+    except for branches with a reservation capacity: their slot counter moves in the same transaction.
+    On those branches the time must fall in one of the slots (422 otherwise).
     """
-    reservation_obj = crud.reservation.create_with_branch_key_check(db=db, obj_in=reservation_in)
+    journal = get_write_behind()
+    if journal is not None:
+        branch = await crud.async_branch.get_info_by_slug(db, slug=reservation_in.branch_key)
+        # Capacity from the database: the registry may not know yet that this branch got one
+        if branch is not None and not await crud.async_reservation_slot.has_capacity(db, branch_id=branch.id):
+            reservation_obj = await crud.async_reservation.build_with_branch_key_check(db=db, obj_in=reservation_in)
+            if not reservation_obj:
+                raise HTTPException(status_code=400, detail="Invalid branch key provided.")
+            receipt = await journal.enqueue(reservation_obj)
+            return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(receipt))
+
+    try:
+        reservation_obj = await crud.async_reservation.create_with_branch_key_check(db=db, obj_in=reservation_in)
+    except SlotFullError:
+        raise HTTPException(status_code=409, detail="No room left in this time slot.")
+    except SlotClosedError:
+        raise HTTPException(status_code=422, detail="The branch takes no reservations at this time.")
     if not reservation_obj:
         raise HTTPException(
             status_code=400,
@@ -26,23 +60,67 @@ def create_reservation(
         )
     return reservation_obj
 
+# Public: free slots of a branch, answered from the slot counters (no aggregate over reservation)
+@router.get("/availability", response_model=schemas.ReservationAvailability)
+async def read_availability(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    branch_key: str,
+    reservation_date: date,
+    guest_count: int = Query(default=1, gt=0),
+) -> Any:
+    """
+    Slots of a branch on a date and whether guest_count more guests fit in each. Public access.
+    Branches without a reservation capacity answer without touching the database.
+    """
+    branch = await crud.async_branch.get_info_by_slug(db, slug=branch_key)
+    if not branch:
+        raise HTTPException(status_code=404, detail="Branch not found")
+    capacity = branch.reservation_capacity
+    booked = {} if capacity is None else await crud.async_reservation_slot.get_booked(
+        db, branch_id=branch.id, slot_date=reservation_date
+    )
+    slots = []
+    for slot_time in slot_times(
+        opens_at=branch.reservation_opens_at, last_slot_at=branch.reservation_last_slot_at,
+        slot_minutes=branch.reservation_slot_minutes,
+    ):
+        remaining = None if capacity is None else max(capacity - booked.get(slot_time, 0), 0)
+        slots.append(schemas.SlotAvailability(
+            reservation_time=slot_time, remaining_guests=remaining,
+            available=remaining is None or remaining >= guest_count,
+        ))
+    return schemas.ReservationAvailability(
+        branch_key=branch.slug, reservation_date=reservation_date, guest_count=guest_count,
+        capacity=capacity, slots=slots,
+    )
+
 # GET endpoint requires authentication and filters by user's branch
 @router.get("/", response_model=List[schemas.ReservationRead])
 def read_reservations(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve reservations for the user's branch (or all for superuser).
     Requires authentication.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
     user_branch_id = None if current_user.is_superuser else current_user.branch_id
-    # The CRUD function handles filtering based on user_branch_id (by fetching slug)
-    reservations = crud.reservation.get_multi_by_branch(
-        db, branch_id=user_branch_id, skip=skip, limit=limit
-    )
+    # The CRUD function filters on the branch_id foreign key
+    try:
+        reservations = crud.reservation.get_multi_by_branch(
+            db, branch_id=user_branch_id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    next_cursor = crud.reservation.next_cursor(reservations, limit=limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return reservations
 
 # PATCH endpoint requires authentication and checks ownership
@@ -52,7 +130,7 @@ def update_reservation_status(
     db: Session = Depends(deps.get_db),
     reservation_id: int,
     reservation_in: schemas.ReservationUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Update a reservation's status. Requires authentication.
@@ -66,9 +144,7 @@ def update_reservation_status(
     if not current_user.is_superuser:
         if not current_user.branch_id:
              raise HTTPException(status_code=403, detail="User is not assigned to a branch")
-        # Check if reservation's branch_key matches user's branch slug
-        branch = crud.branch.get(db, id=current_user.branch_id)
-        if not branch or db_reservation.branch_key != branch.slug:
+        if db_reservation.branch_id != current_user.branch_id:
             raise HTTPException(status_code=403, detail="Not authorized to update this reservation")
 
     updated_reservation = crud.reservation.update_status(
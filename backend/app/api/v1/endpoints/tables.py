@@ -1,6 +1,7 @@
 from typing import Any, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 
 from app import crud, models, schemas
@@ -8,13 +9,16 @@ from app.api import deps
 
 router = APIRouter()
 
+# Upper bound for one bulk request (a banquet hall is a few hundred tables)
+MAX_BULK_TABLES = 1000
+
 
 @router.get("/", response_model=List[schemas.ManagedTableRead])
 def read_tables(
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve tables for the user's branch (or all for superuser).
@@ -35,7 +39,7 @@ def create_tables_bulk(
     *, # Keyword-only arguments
     db: Session = Depends(deps.get_db),
     tables_in: schemas.ManagedTableBulkCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create tables in bulk for the current user's branch.
@@ -56,17 +60,33 @@ def create_tables_bulk(
     if not branch: # Should not happen if branch_id is set
         raise HTTPException(status_code=404, detail="User's assigned branch not found")
 
-    # Validate start/end numbers
-    if tables_in.start_number <= 0 or tables_in.end_number < tables_in.start_number:
+    # Validate start/end numbers (range form) and the resulting number set
+    if (tables_in.start_number is None) != (tables_in.end_number is None):
+        raise HTTPException(status_code=400, detail="Both start_number and end_number are required for a range.")
+    if tables_in.start_number is not None and (
+        tables_in.start_number <= 0 or tables_in.end_number < tables_in.start_number
+    ):
         raise HTTPException(status_code=400, detail="Invalid start or end table number.")
-    
-    # Optional: Add limit to bulk creation size?
-    # if tables_in.end_number - tables_in.start_number > 100: # Example limit
-    #     raise HTTPException(status_code=400, detail="Cannot create more than 100 tables at once.")
-
-    created_tables = crud.table.create_bulk(
-        db=db, tables_in=tables_in, branch=branch
-    )
+    # Bound the request before expanding the range, so a huge end_number never becomes a huge list
+    requested = len(tables_in.table_numbers or [])
+    if tables_in.start_number is not None:
+        requested += tables_in.end_number - tables_in.start_number + 1
+    if requested > MAX_BULK_TABLES:
+        raise HTTPException(status_code=400, detail=f"Cannot create more than {MAX_BULK_TABLES} tables at once.")
+    table_numbers = tables_in.requested_numbers()
+    if not table_numbers:
+        raise HTTPException(status_code=400, detail="No table numbers provided.")
+    if table_numbers[0] <= 0:
+        raise HTTPException(status_code=400, detail="Table numbers must be positive.")
+
+    try:
+        created_tables = crud.table.create_bulk(
+            db=db, tables_in=tables_in, branch=branch
+        )
+    except IntegrityError:
+        # Another request inserted some of the same numbers between our check and insert
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Some tables were created concurrently. Please retry.")
     return created_tables
 
 
@@ -75,7 +95,7 @@ def delete_tables_bulk(
     *, # Keyword-only arguments
     db: Session = Depends(deps.get_db),
     tables_in: schemas.ManagedTableBulkDelete,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Delete tables in bulk. Ensures tables belong to the user's branch.
@@ -88,14 +108,18 @@ def delete_tables_bulk(
     if not current_user.branch_id:
         raise HTTPException(status_code=403, detail="User is not assigned to a branch")
 
-    deleted_count = crud.table.remove_bulk(
+    deleted_ids = crud.table.remove_bulk(
         db=db, table_ids=tables_in.table_ids, branch_id=current_user.branch_id
     )
-    if deleted_count != len(tables_in.table_ids):
-        # This indicates some IDs didn't belong to the branch or didn't exist
-        # You might want to log this or return a more specific message
-        pass 
-    return {"message": f"Successfully deleted {deleted_count} tables.", "deleted_count": deleted_count}
+    # IDs that don't exist or belong to another branch are reported, not deleted
+    deleted = set(deleted_ids)
+    not_found_ids = [table_id for table_id in dict.fromkeys(tables_in.table_ids) if table_id not in deleted]
+    return {
+        "message": f"Successfully deleted {len(deleted_ids)} tables.",
+        "deleted_count": len(deleted_ids),
+        "deleted_ids": deleted_ids,
+        "not_found_ids": not_found_ids,
+    }
 
 
 @router.put("/{table_id}", response_model=schemas.ManagedTableRead)
@@ -104,7 +128,7 @@ def update_table(
     db: Session = Depends(deps.get_db),
     table_id: int,
     table_in: schemas.ManagedTableUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.UserPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Update a table's settings (overrides). Ensures table belongs to user's branch.
@@ -125,13 +149,17 @@ def update_table(
               raise HTTPException(status_code=404, detail="Table's associated branch not found") # Data integrity issue
          branch_slug = branch.slug
     else:
-         # User is assigned to this branch, fetch branch info if needed (or get slug from user?)
-         branch = crud.branch.get(db, id=current_user.branch_id)
-         if not branch:
+         # User is assigned to this branch: the slug comes with the principal
+         branch_slug = current_user.branch_slug
+         if not branch_slug:
              raise HTTPException(status_code=404, detail="User's assigned branch not found")
-         branch_slug = branch.slug
 
-    updated_table = crud.table.update_with_link_regen(
-        db=db, db_obj=db_table, obj_in=table_in, branch_slug=branch.slug
-    )
+    try:
+        updated_table = crud.table.update_with_link_regen(
+            db=db, db_obj=db_table, obj_in=table_in, branch_slug=branch_slug
+        )
+    except IntegrityError:
+        # The new table_number is already taken in this branch
+        db.rollback()
+        raise HTTPException(status_code=409, detail="A table with this number already exists in the branch.")
     return updated_table 
\ No newline at end of file
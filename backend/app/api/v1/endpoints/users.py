@@ -20,13 +20,13 @@ def create_user_signup(
     Create new user without the need to be logged in.
     (Consider if this should be admin-only or require an invitation system).
     """
-    user = crud.user.get_by_email(db, email=user_in.email)
-    if user:
+    # One existence check for both unique fields (an email conflict is reported first)
+    user = crud.user.get_by_email_or_username(db, email=user_in.email, username=user_in.username)
+    if user and user.email == user_in.email:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system.",
         )
-    user = crud.user.get_by_username(db, username=user_in.username)
     if user:
         raise HTTPException(
             status_code=400,
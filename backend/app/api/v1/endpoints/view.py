@@ -1,11 +1,15 @@
-from typing import Any, List, Dict
+from dataclasses import dataclass
+from typing import Any, List, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud, models, schemas
 from app.api import deps # For get_db
 from app.core.config import settings # For BASE_URL, maybe link labels/icons
+from app.core.cache import table_view_cache
+from app.utils.http import etag_matches, make_etag
 
 # Define link labels and icons based on frontend/src/pages/admin/BranchSettings.tsx
 LINK_CONFIG = {
@@ -26,41 +30,40 @@ LINK_CONFIG = {
 
 router = APIRouter()
 
-@router.get("/sube/{branch_slug}/table/{table_number}", response_model=schemas.TableCustomerViewData)
-def get_table_customer_view(
-    *, 
-    db: Session = Depends(deps.get_db),
-    branch_slug: str = Path(..., description="Slug of the branch"),
-    table_number: int = Path(..., description="Table number", gt=0)
-) -> Any:
-    """
-    Retrieve data needed for the customer view of a specific table.
-    Public access.
-    """
-    # 1. Find BranchSetting by slug
-    branch = crud.branch.get_by_slug(db, slug=branch_slug)
-    if not branch:
-        raise HTTPException(status_code=404, detail="Branch not found")
 
-    # 2. Find ManagedTable by table_number and branch_id
-    table = crud.table.get_by_number_and_branch(
-        db, table_number=table_number, branch_id=branch.id
-    )
-    if not table:
-        raise HTTPException(status_code=404, detail="Table not found in this branch")
+@dataclass(frozen=True)
+class CachedTableView:
+    """A serialized customer view plus the ids needed to invalidate it (see app.core.cache)."""
+    branch_id: int
+    table_id: int
+    table_number: int
+    body: bytes # JSON-encoded schemas.TableCustomerViewData
+    etag: str
+
 
-    # 3. Calculate effective links
+def _view_response(cached: CachedTableView, if_none_match: Optional[str]) -> Response:
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": f"public, max-age={settings.TABLE_VIEW_MAX_AGE_SECONDS}",
+    }
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def build_table_customer_view(
+    branch: models.BranchSetting, table: models.ManagedTable
+) -> schemas.TableCustomerViewData:
+    """Merges branch defaults with table overrides and orders them by branch.link_order."""
     # Start with default branch links
-    effective_links = branch.default_links.copy()
+    effective_links = dict(branch.default_links or {})
     # Override with table-specific links if they exist
     if table.overridden_links:
         effective_links.update(table.overridden_links)
-        
-    # 4. Order and format links based on branch.link_order
-    ordered_link_items: List[schemas.LinkItem] = []
-    processed_keys = set()
 
-    for key in branch.link_order:
+    # Order and format links based on branch.link_order
+    ordered_link_items: List[schemas.LinkItem] = []
+    for key in branch.link_order or []:
         if key in effective_links:
             url = effective_links[key]
             config = LINK_CONFIG.get(key, LINK_CONFIG["default"])
@@ -70,11 +73,10 @@ def get_table_customer_view(
                 icon=config.get("icon"), # Icon is optional
                 url=str(url) # Ensure URL is string
             ))
-            processed_keys.add(key)
-            
+
     # Add any remaining links from effective_links that were not in link_order (optional)
     # for key, url in effective_links.items():
-    #     if key not in processed_keys:
+    #     if key not in branch.link_order:
     #         config = LINK_CONFIG.get(key, LINK_CONFIG["default"])
     #         ordered_link_items.append(schemas.LinkItem(
     #             key=key,
@@ -83,16 +85,50 @@ def get_table_customer_view(
     #             url=str(url)
     #         ))
 
-    # Determine the main QR link (already generated and stored in table.link)
-    main_qr_link = table.link
+    return schemas.TableCustomerViewData(
+        ordered_links=ordered_link_items,
+        display_whatsapp_number=branch.display_whatsapp_number
+    )
 
-    # Get the display WhatsApp number from the branch
-    whatsapp_number = branch.display_whatsapp_number
 
-    # Construct the response
-    response_data = schemas.TableCustomerViewData(
-        ordered_links=ordered_link_items,
-        display_whatsapp_number=whatsapp_number
+@router.get("/sube/{branch_slug}/table/{table_number}", response_model=schemas.TableCustomerViewData)
+async def get_table_customer_view(
+    *, 
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    branch_slug: str = Path(..., description="Slug of the branch"),
+    table_number: int = Path(..., description="Table number", gt=0)
+) -> Any:
+    """
+    Retrieve data needed for the customer view of a specific table.
+    Public access. Served from table_view_cache once warm (no DB round trips).
+    Returns pre-encoded JSON with an ETag; a matching If-None-Match gets a 304.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    cache_key = (branch_slug, table_number)
+    cached: Optional[CachedTableView] = table_view_cache.get(cache_key)
+    if cached is not None:
+        return _view_response(cached, if_none_match)
+    # Read before the query: an admin write invalidating views meanwhile makes the result uncacheable
+    generation = table_view_cache.generation
+
+    # 1. Find BranchSetting and ManagedTable in one joined query
+    branch, table = await crud.async_table.get_with_branch_by_slug(
+        db, branch_slug=branch_slug, table_number=table_number
     )
+    if not branch:
+        raise HTTPException(status_code=404, detail="Branch not found")
+    if not table:
+        raise HTTPException(status_code=404, detail="Table not found in this branch")
 
-    return response_data 
\ No newline at end of file
+    # 2. Build effective, ordered links, encode once and cache the result
+    body = build_table_customer_view(branch, table).model_dump_json().encode("utf-8")
+    cached = CachedTableView(
+        branch_id=branch.id,
+        table_id=table.id,
+        table_number=table.table_number,
+        body=body,
+        etag=make_etag(body),
+    )
+    table_view_cache.set_if_generation(cache_key, cached, generation)
+    return _view_response(cached, if_none_match)
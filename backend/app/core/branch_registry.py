@@ -0,0 +1,99 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import time as time_of_day
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class BranchInfo:
+    """Read-only copy of a BranchSetting row, safe to share between requests and threads."""
+    id: int
+    slug: str
+    name: str
+    display_whatsapp_number: Optional[str]
+    default_links: Dict[str, Any]
+    link_order: List[str]
+    reservation_capacity: Optional[int]
+    reservation_slot_minutes: int
+    reservation_opens_at: time_of_day
+    reservation_last_slot_at: time_of_day
+
+    @classmethod
+    def from_model(cls, branch: Any) -> "BranchInfo":
+        return cls(
+            id=branch.id,
+            slug=branch.slug,
+            name=branch.name,
+            display_whatsapp_number=branch.display_whatsapp_number,
+            default_links=dict(branch.default_links or {}),
+            link_order=list(branch.link_order or []),
+            reservation_capacity=branch.reservation_capacity,
+            reservation_slot_minutes=branch.reservation_slot_minutes,
+            reservation_opens_at=branch.reservation_opens_at,
+            reservation_last_slot_at=branch.reservation_last_slot_at,
+        )
+
+
+class BranchRegistry:
+    def __init__(self, ttl: float):
+        """
+        All branches of the database in memory, by slug and by id.
+
+        Writes in this worker update it directly (see crud_branch); other workers either send a
+        Postgres NOTIFY (BRANCH_REGISTRY_NOTIFY, see app.db.branch_events) or are caught by the
+        TTL, after which the next lookup reloads the whole table in one query.
+
+        **Parameters**
+
+        * `ttl`: Seconds before a full reload is due (bounds staleness without NOTIFY)
+        """
+        self.ttl = ttl
+        self._by_slug: Dict[str, BranchInfo] = {}
+        self._by_id: Dict[int, BranchInfo] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    @property
+    def is_stale(self) -> bool:
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > self.ttl
+
+    def replace_all(self, branches: Iterable[Any]) -> None:
+        infos = [BranchInfo.from_model(branch) for branch in branches]
+        with self._lock:
+            self._by_slug = {info.slug: info for info in infos}
+            self._by_id = {info.id: info for info in infos}
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def put(self, branch: Any) -> BranchInfo:
+        """Adds or replaces one branch; a renamed branch loses its old slug."""
+        info = BranchInfo.from_model(branch)
+        with self._lock:
+            previous = self._by_id.get(info.id)
+            if previous is not None and previous.slug != info.slug:
+                self._by_slug.pop(previous.slug, None)
+            self._by_slug[info.slug] = info
+            self._by_id[info.id] = info
+        return info
+
+    def get(self, slug: str) -> Optional[BranchInfo]:
+        return self._by_slug.get(slug)
+
+    def get_by_id(self, id: int) -> Optional[BranchInfo]:
+        return self._by_id.get(id)
+
+    def invalidate(self) -> None:
+        """Marks the registry stale: the next lookup reloads it."""
+        self._loaded_at = None
+
+    def info(self) -> Dict[str, Any]:
+        return {"branches": len(self._by_id), "stale": self.is_stale, "reloads": self.reloads}
+
+
+# Branch keys of public submissions are validated here instead of with a query per request
+branch_registry = BranchRegistry(ttl=settings.BRANCH_REGISTRY_TTL_SECONDS)
@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Iterable, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class LRUCache(Generic[K, V]):
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        """
+        Thread-safe, size-bounded LRU mapping with optional per-entry expiry.
+
+        **Parameters**
+
+        * `maxsize`: Maximum number of entries kept; the least recently used is evicted first
+        * `ttl`: Default lifetime of an entry in seconds (None = until evicted or invalidated)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[K, Tuple[V, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped by every invalidation (pop, discard_where, clear); see set_if_generation
+        self.generation = 0
+
+    def get(self, key: K, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        self.set_if_generation(key, value, None, ttl=ttl)
+
+    def set_if_generation(self, key: K, value: V, generation: Optional[int], ttl: Optional[float] = None) -> bool:
+        """
+        set() unless an invalidation ran since `generation` was read (None = always set): a value
+        loaded from the database before a write must not be cached after that write invalidated it.
+        """
+        if self.maxsize <= 0:
+            return False
+        lifetime = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + lifetime if lifetime is not None else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def pop(self, key: K) -> Optional[V]:
+        with self._lock:
+            self.generation += 1
+            item = self._data.pop(key, None)
+        return item[0] if item else None
+
+    def discard_where(self, predicate: Callable[[K, V], bool]) -> int:
+        """Removes every entry for which predicate(key, value) is true. Returns count."""
+        with self._lock:
+            self.generation += 1
+            doomed = [key for key, (value, _) in self._data.items() if predicate(key, value)]
+            for key in doomed:
+                del self._data[key]
+        return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            size = len(self._data)
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Fully built customer views keyed by (branch_slug, table_number).
+# Entries carry branch_id / table_id / table_number so writes can invalidate them precisely.
+# The TTL only bounds staleness across uvicorn workers; same-worker writes invalidate immediately.
+table_view_cache: LRUCache = LRUCache(
+    maxsize=settings.TABLE_VIEW_CACHE_SIZE,
+    ttl=settings.TABLE_VIEW_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_table_views(
+    *,
+    branch_id: Optional[int] = None,
+    table_ids: Optional[Iterable[int]] = None,
+    table_numbers: Optional[Iterable[int]] = None,
+) -> int:
+    """
+    Drops cached customer views touched by a write.
+    With only branch_id, every table of that branch is dropped; table_ids / table_numbers narrow it down.
+    """
+    ids = set(table_ids) if table_ids is not None else None
+    numbers = set(table_numbers) if table_numbers is not None else None
+
+    def _matches(key: Any, entry: Any) -> bool:
+        if branch_id is not None and entry.branch_id != branch_id:
+            return False
+        if ids is not None and entry.table_id in ids:
+            return True
+        if numbers is not None and entry.table_number in numbers:
+            return True
+        return ids is None and numbers is None
+
+    return table_view_cache.discard_where(_matches)
+
+
+# Validated token payloads (schemas.TokenPayload) keyed by a digest of the token.
+# Each entry lives until the token's own exp, so a cache hit never outlives the token.
+token_cache: LRUCache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+
+# Authenticated users (schemas.UserPrincipal) keyed by user id, so authorization needs no query.
+# Same-worker writes invalidate immediately; the short TTL bounds staleness in other workers.
+user_principal_cache: LRUCache = LRUCache(
+    maxsize=settings.USER_PRINCIPAL_CACHE_SIZE,
+    ttl=settings.USER_PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_user_principals(*, user_id: Optional[int] = None, branch_id: Optional[int] = None) -> int:
+    """Drops the cached principal of one user, or of every user assigned to branch_id."""
+    if user_id is not None:
+        return 1 if user_principal_cache.pop(user_id) is not None else 0
+    if branch_id is not None:
+        return user_principal_cache.discard_where(lambda key, principal: principal.branch_id == branch_id)
+    return 0
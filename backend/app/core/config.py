@@ -7,12 +7,27 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None # Defaults to DATABASE_URL with an asyncio driver (asyncpg)
+
+    # Connection pool (applies to the sync and the async engine separately)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0 # Seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800 # Seconds; recycle connections before the server/proxy drops them
+    DB_POOL_PRE_PING_INTERVAL: int = 30 # Ping only connections idle longer than this; 0 = every checkout, <0 = never
 
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_BACKEND: str = "jose" # "jose" (python-jose) or "pyjwt" (PyJWT, optional dependency, faster)
+    TOKEN_CACHE_SIZE: int = 2048 # Decoded tokens kept per worker until they expire (0 = disabled)
+
+    # Password hashing (bcrypt runs in a process pool, see app.core.security)
+    PASSWORD_HASH_WORKERS: int = 2 # Processes per uvicorn worker; 0 = hash inline on the request thread
+    PASSWORD_HASH_QUEUE_SIZE: int = 16 # Hashes allowed to wait for a free process before rejecting
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 2.0 # Seconds to wait for a queue slot before answering 503
 
     # API
     API_V1_STR: str = "/api/v1"
@@ -24,6 +39,39 @@ class Settings(BaseSettings):
     # Base URL
     BASE_URL: str = "http://localhost:8000"
 
+    # CV storage
+    CV_STORAGE_BACKEND: str = "local" # "local" (directory, one host) or "s3" (S3-compatible, shared by replicas)
+    CV_STORAGE_LOCAL_DIR: str = "/app/uploads/cv"
+    CV_X_ACCEL_REDIRECT_PREFIX: Optional[str] = None # e.g. "/_protected_cv/": nginx serves local CVs (sendfile, Range) after auth
+    S3_BUCKET: Optional[str] = None
+    S3_PREFIX: str = "cv/"
+    S3_ENDPOINT_URL: Optional[str] = None # e.g. http://minio:9000; None = AWS
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None # None = boto3's default credential chain
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+
+    # Write-behind for public submissions (see app.db.write_behind)
+    WRITE_BEHIND_ENABLED: bool = False # True = journal reservations/messages/applications locally, answer 202, insert in batches
+    WRITE_BEHIND_JOURNAL_PATH: str = "/app/data/write_behind.sqlite3" # Persistent volume, shared by the workers of one host
+    WRITE_BEHIND_BATCH_SIZE: int = 500 # Rows per multi-row INSERT
+    WRITE_BEHIND_FLUSH_INTERVAL: float = 0.5 # Seconds between flushes when the journal is not backlogged
+    WRITE_BEHIND_CLAIM_TIMEOUT: float = 60.0 # Seconds before a batch claimed by a dead worker is retried
+
+    # Instrumentation (see app.core.metrics)
+    METRICS_ENABLED: bool = True # Serve Prometheus metrics on /metrics (restrict it at the proxy)
+    METRICS_PROCESS_INTERVAL: float = 15.0 # Seconds between process stat updates per worker (multiprocess mode)
+    SERVER_TIMING_ENABLED: bool = True # Server-Timing header with per-request SQL count and DB time
+    QUERY_COUNT_LOG_THRESHOLD: int = 10 # Log requests running at least this many SQL statements (likely N+1); 0 = off
+
+    # Caching
+    TABLE_VIEW_CACHE_SIZE: int = 4096 # Max cached (branch_slug, table_number) customer views per worker
+    TABLE_VIEW_CACHE_TTL_SECONDS: int = 300 # Upper bound on staleness across workers
+    TABLE_VIEW_MAX_AGE_SECONDS: int = 30 # Cache-Control max-age sent to phones / CDN
+    USER_PRINCIPAL_CACHE_SIZE: int = 1024 # Max cached authenticated users per worker (0 = disabled)
+    USER_PRINCIPAL_CACHE_TTL_SECONDS: int = 30 # How long another worker may keep serving a changed/deactivated user
+    BRANCH_REGISTRY_TTL_SECONDS: int = 300 # In-memory branch list reloaded after this long (bounds staleness without NOTIFY)
+    BRANCH_REGISTRY_NOTIFY: bool = False # PostgreSQL only: LISTEN/NOTIFY pushes branch changes to every worker (one connection each)
+
 @lru_cache
 def get_settings() -> Settings:
     return Settings()
@@ -0,0 +1,217 @@
+"""
+Request instrumentation: Prometheus metrics on /metrics (request rate, latency, errors and SQL
+per route template, requests in flight, process stats), plus per-request SQL statistics
+(app.db.query_stats) surfaced as a Server-Timing header and a log line for suspicious query counts.
+
+Several uvicorn/gunicorn workers: every worker only sees its own requests, so point
+PROMETHEUS_MULTIPROC_DIR at an empty directory (wipe it before the workers start) and /metrics
+merges the files all workers write there, whichever worker answers the scrape:
+
+    rm -rf /tmp/prometheus && mkdir /tmp/prometheus
+    PROMETHEUS_MULTIPROC_DIR=/tmp/prometheus uvicorn app.main:app --workers 4
+
+It must be a real environment variable: prometheus_client reads it when it is imported.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, ProcessCollector,
+    generate_latest, multiprocess,
+)
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.query_stats import QueryStats, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+UNMATCHED_ROUTE = "<unmatched>" # 404s share one label value instead of one per raw path
+
+# Labelled by route template (/musteri/sube/{branch_slug}/table/{table_number}), never the raw path
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template, method and status code.",
+    ["method", "route", "status"],
+)
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the last body chunk is sent.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being served.",
+    ["method"], # The route is only known once routing ran
+    multiprocess_mode="livesum", # Summed over the live workers
+)
+
+DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per HTTP request.",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route (e.g. /api/v1/musteri/sube/{branch_slug}/table/{table_number})."""
+    route = scope.get("route") # Set by FastAPI's APIRoute
+    if route is None and "endpoint" in scope:
+        # Plain Starlette routes (/metrics, add_route) only leave their endpoint in the scope
+        route = next(
+            (route for route in getattr(scope.get("router"), "routes", ()) if getattr(route, "endpoint", None) is scope["endpoint"]),
+            None,
+        )
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def server_timing(stats: QueryStats) -> str:
+    noun = "query" if stats.count == 1 else "queries"
+    value = f'db;dur={stats.total_ms:.1f};desc="{stats.count} {noun}"'
+    if stats.count:
+        value += f", db-slowest;dur={stats.slowest_ms:.1f}"
+    return value
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware: streaming responses stay streaming).
+    Times each request, collects its SQL statements, adds Server-Timing to the response and
+    records the per-route metrics once the response is sent.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500 # Unless a response starts: an exception escaped and ServerErrorMiddleware answers
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        in_flight = IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    MutableHeaders(scope=message).append("Server-Timing", server_timing(stats))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            current_query_stats.reset(token)
+            self.observe(scope, status, elapsed, stats)
+
+    def observe(self, scope: Scope, status: int, elapsed: float, stats: QueryStats) -> None:
+        method, route = scope["method"], route_template(scope)
+        REQUESTS.labels(method, route, status).inc()
+        REQUEST_SECONDS.labels(method, route, status).observe(elapsed)
+        DB_QUERIES.labels(method, route).observe(stats.count)
+        DB_SECONDS.labels(method, route).observe(stats.total_ms / 1000)
+        threshold = settings.QUERY_COUNT_LOG_THRESHOLD
+        if threshold > 0 and stats.count >= threshold:
+            # Many statements in one request usually means a query per item (N+1)
+            logger.warning(
+                "%s %s ran %d SQL statements (%.1f ms in DB); slowest %.1f ms: %s",
+                method, route, stats.count, stats.total_ms, stats.slowest_ms,
+                _shorten(stats.slowest_statement),
+            )
+
+
+def _shorten(statement: Optional[str], limit: int = 300) -> str:
+    text = " ".join((statement or "").split())
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+# Process stats. Single process: the default registry's ProcessCollector. Multiprocess it would only
+# describe the worker answering the scrape, so each worker copies its own into pid-labelled gauges.
+_process_collector: Optional[ProcessCollector] = None
+_process_gauges: Dict[str, Gauge] = {}
+_process_task: Optional["asyncio.Task[None]"] = None
+
+if MULTIPROCESS:
+    _process_collector = ProcessCollector(registry=None)
+    _process_gauges = {
+        # One series per live pid; values go to the directory, so stay off the default registry
+        # (it keeps its own ProcessCollector under the same names)
+        name: Gauge(name, documentation, multiprocess_mode="liveall", registry=None)
+        for name, documentation in (
+            ("process_resident_memory_bytes", "Resident memory size in bytes."),
+            ("process_virtual_memory_bytes", "Virtual memory size in bytes."),
+            ("process_cpu_seconds", "User and system CPU time spent in seconds."),
+            ("process_open_fds", "Number of open file descriptors."),
+            ("process_start_time_seconds", "Start time of the process since unix epoch in seconds."),
+        )
+    }
+
+
+def update_process_metrics() -> None:
+    if _process_collector is None:
+        return
+    for family in _process_collector.collect(): # Reads /proc; nothing on other platforms
+        for sample in family.samples:
+            gauge = _process_gauges.get(sample.name.removesuffix("_total"))
+            if gauge is not None:
+                gauge.set(sample.value)
+
+
+async def _refresh_process_metrics() -> None:
+    while True:
+        update_process_metrics()
+        await asyncio.sleep(settings.METRICS_PROCESS_INTERVAL)
+
+
+async def start_metrics() -> None:
+    global _process_task
+    if MULTIPROCESS and settings.METRICS_ENABLED:
+        _process_task = asyncio.create_task(_refresh_process_metrics(), name="process-metrics")
+
+
+async def stop_metrics() -> None:
+    global _process_task
+    if _process_task is not None:
+        task, _process_task = _process_task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    if MULTIPROCESS:
+        # Drops this worker's live gauges (in flight, process stats) from the merged view
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def metrics_endpoint(request: Request) -> Response:
+    """Prometheus text exposition: this process, or every worker's files merged in multiprocess mode."""
+    if MULTIPROCESS:
+        update_process_metrics()
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -1,16 +1,50 @@
+import hashlib
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Callable, Dict, Union, Optional
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
+from pydantic import ValidationError
 
+from app.core.cache import token_cache
 from app.core.config import settings
 from app.schemas.auth import TokenPayload # Import the schema
 
+try:
+    import jwt as pyjwt # PyJWT (optional, JWT_BACKEND="pyjwt")
+except ImportError:
+    pyjwt = None
+
+logger = logging.getLogger(__name__)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 ALGORITHM = settings.ALGORITHM
 
+if settings.JWT_BACKEND not in ("jose", "pyjwt"):
+    raise ValueError(f"Unknown JWT_BACKEND '{settings.JWT_BACKEND}'. Use 'jose' or 'pyjwt'.")
+if settings.JWT_BACKEND == "pyjwt" and pyjwt is None:
+    raise ImportError("JWT_BACKEND='pyjwt' requires the PyJWT package (pip install PyJWT).")
+
+# Both backends produce and accept the same HS256 tokens, so switching does not log anyone out
+_JWT_ERRORS: tuple = (pyjwt.PyJWTError,) if settings.JWT_BACKEND == "pyjwt" else (JWTError,)
+
+def _jwt_encode(claims: Dict[str, Any]) -> str:
+    if settings.JWT_BACKEND == "pyjwt":
+        return pyjwt.encode(claims, settings.SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=ALGORITHM)
+
+def _jwt_decode(token: str) -> Dict[str, Any]:
+    if settings.JWT_BACKEND == "pyjwt":
+        return pyjwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+
 def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
 ) -> str:
@@ -21,7 +55,7 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = _jwt_encode(to_encode)
     return encoded_jwt
 
 def create_refresh_token(
@@ -32,21 +66,174 @@ def create_refresh_token(
     else:
         expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"} # Add type claim
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = _jwt_encode(to_encode)
     return encoded_jwt
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# --- Password hashing ---
+# bcrypt costs ~250 ms of CPU per call. It runs in a small process pool so a burst of logins
+# cannot occupy every request thread and core of a worker; a bounded semaphore caps queued work.
+# Workers are spawned, which re-imports __main__: standalone scripts that hash passwords need an
+# `if __name__ == "__main__":` guard, or PASSWORD_HASH_WORKERS=0.
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing queue stays full for PASSWORD_HASH_QUEUE_TIMEOUT (mapped to 503)."""
+
+
+class PasswordHashStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+
+    def started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def finished(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_ms += elapsed_ms
+
+    def reject(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": settings.PASSWORD_HASH_WORKERS,
+                "queue_size": settings.PASSWORD_HASH_QUEUE_SIZE,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "mean_ms": round(self.total_ms / self.completed, 3) if self.completed else 0.0,
+            }
+
+
+password_hash_stats = PasswordHashStats()
+_hash_slots = threading.BoundedSemaphore(max(1, settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE))
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_executor_lock = threading.Lock()
+
+
+def _get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            # spawn: never fork a process that already runs threads and an event loop
+            _hash_executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hash_executor
+
+
+def _discard_hash_executor(broken: ProcessPoolExecutor) -> None:
+    """Drops a pool whose worker died (OOM kill, segfault) so the next call starts a fresh one."""
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is broken: # Another thread may have replaced it already
+            _hash_executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit_hashing(func: Callable[..., Any], *args: Any) -> Any:
+    executor = _get_hash_executor()
+    try:
+        return executor.submit(func, *args).result()
+    except BrokenProcessPool:
+        _discard_hash_executor(executor)
+    logger.warning("Password hashing pool broke; retrying on a new pool")
+    executor = _get_hash_executor()
+    try:
+        return executor.submit(func, *args).result()
+    except BrokenProcessPool:
+        _discard_hash_executor(executor)
+    # Twice in a row: don't fail the login, hash in this process
+    logger.error("Password hashing pool broke again; hashing in-process")
+    return func(*args)
+
+
+def _warm_up() -> None:
+    return None
+
+def start_password_hashing() -> None:
+    """Starts the hashing processes up front (application startup) so the first logins skip the spawn cost."""
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return
+    executor = _get_hash_executor()
+    for future in [executor.submit(_warm_up) for _ in range(settings.PASSWORD_HASH_WORKERS)]:
+        future.result()
+
+def shutdown_password_hashing() -> None:
+    """Stops the hashing processes (application shutdown)."""
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=True, cancel_futures=True)
+            _hash_executor = None
+
+
+def _run_hashing(func: Callable[..., Any], *args: Any) -> Any:
+    if not _hash_slots.acquire(timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT):
+        password_hash_stats.reject()
+        raise PasswordHashingBusy()
+    password_hash_stats.started()
+    start = time.perf_counter()
+    try:
+        if settings.PASSWORD_HASH_WORKERS <= 0:
+            return func(*args)
+        # The request thread only waits here; the CPU work happens in another process
+        return _submit_hashing(func, *args)
+    finally:
+        password_hash_stats.finished((time.perf_counter() - start) * 1000)
+        _hash_slots.release()
+
+
+# bcrypt hash (same cost as pwd_context) of a random string nobody knows. Verifying against it for
+# unknown users makes a failed login take as long whether or not the account exists.
+DUMMY_PASSWORD_HASH = "$2b$12$AMMtiOOTqvqoDuxNcsC0ZuJGYMfAkHFIGHLLCY1sM9/Y2AWHM7ST2"
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
+def _get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def decode_token(token: str) -> Optional[TokenPayload]:
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _run_hashing(_verify_password, plain_password, hashed_password)
+
+def get_password_hash(password: str) -> str:
+    return _run_hashing(_get_password_hash, password)
+
+def _decode_token_uncached(token: str) -> Optional[TokenPayload]:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[ALGORITHM]
-        )
+        payload = _jwt_decode(token)
         token_data = TokenPayload(**payload)
         return token_data
-    except JWTError:
-        return None 
\ No newline at end of file
+    except _JWT_ERRORS + (ValidationError,):
+        return None
+
+def decode_token(token: str) -> Optional[TokenPayload]:
+    """
+    Verified payload of token, or None if it is invalid or expired.
+    Valid tokens are cached by digest until their exp, so a dashboard repeating the same
+    token pays for signature verification and validation once. Invalid tokens are never cached.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    token_data = token_cache.get(key)
+    if token_data is not None:
+        return token_data
+    token_data = _decode_token_uncached(token)
+    if token_data is not None and token_data.exp is not None:
+        remaining = token_data.exp - time.time()
+        if remaining > 0:
+            token_cache.set(key, token_data, ttl=remaining)
+    return token_data 
\ No newline at end of file
@@ -1,9 +1,10 @@
-from .crud_user import user
-from .crud_branch import branch
-from .crud_table import table
-from .crud_reservation import reservation
-from .crud_application import application
-from .crud_message import message
+from .crud_user import user, async_user
+from .crud_branch import branch, async_branch
+from .crud_table import table, async_table
+from .crud_reservation import reservation, async_reservation
+from .crud_reservation_slot import reservation_slot, async_reservation_slot
+from .crud_application import application, async_application
+from .crud_message import message, async_message
 # Import other crud modules here as they are created
 # from .crud_reservation import reservation
 # from .crud_application import application
@@ -1,14 +1,35 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import tuple_
 from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 # Define Type Variables for the SQLAlchemy model and Pydantic schemas
 ModelType = TypeVar("ModelType", bound=SQLModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+
+def encode_cursor(timestamp: datetime, id: int) -> str:
+    """Opaque keyset cursor for the row (timestamp, id) a page ended on."""
+    raw = json.dumps([timestamp.isoformat(), id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor. Raises ValueError for anything it did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
@@ -20,6 +41,30 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
 
+    # Timestamp column used for newest-first keyset pagination (set by subclasses that list by time)
+    cursor_field: Optional[str] = None
+
+    def apply_cursor(self, statement: Any, *, cursor: Optional[str] = None) -> Any:
+        """
+        Orders newest first by (cursor_field, id) and, given a cursor, continues after that row:
+        WHERE (ts, id) < (:ts, :id). Each page is an index range scan, however deep.
+        Raises ValueError for an invalid cursor.
+        """
+        timestamp_column = getattr(self.model, self.cursor_field)
+        if cursor:
+            timestamp, last_id = decode_cursor(cursor)
+            statement = statement.where(
+                tuple_(timestamp_column, self.model.id) < tuple_(timestamp, last_id)
+            )
+        return statement.order_by(timestamp_column.desc(), self.model.id.desc())
+
+    def next_cursor(self, items: List[ModelType], *, limit: int) -> Optional[str]:
+        """Cursor for the page after items, or None if items was the last page."""
+        if limit <= 0 or len(items) < limit:
+            return None
+        last = items[-1]
+        return encode_cursor(getattr(last, self.cursor_field), last.id)
+
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         return db.get(self.model, id)
 
@@ -34,7 +79,6 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj = self.model.model_validate(obj_in) 
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
 
     def update(
@@ -55,7 +99,6 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 setattr(db_obj, field, update_data[field])
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
 
     def remove(self, db: Session, *, id: Any) -> Optional[ModelType]:
@@ -63,4 +106,58 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if obj:
             db.delete(obj)
             db.commit()
-        return obj 
\ No newline at end of file
+        return obj 
+
+
+class AsyncCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    def __init__(self, model: Type[ModelType]):
+        """
+        Asyncio counterpart of CRUDBase, used with AsyncSession (see app.db.session.get_async_db).
+
+        **Parameters**
+
+        * `model`: A SQLModel model class
+        """
+        self.model = model
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await db.get(self.model, id)
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[ModelType]:
+        statement = select(self.model).offset(skip).limit(limit)
+        results = await db.execute(statement)
+        return results.scalars().all()
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        db_obj = self.model.model_validate(obj_in)
+        db.add(db_obj)
+        await db.commit()
+        return db_obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        obj_data = jsonable_encoder(db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        for field in obj_data:
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+        db.add(db_obj)
+        await db.commit()
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: Any) -> Optional[ModelType]:
+        obj = await db.get(self.model, id)
+        if obj:
+            await db.delete(obj)
+            await db.commit()
+        return obj
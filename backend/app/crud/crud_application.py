@@ -1,34 +1,37 @@
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Dict, Optional, Tuple, Union, List
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.crud.base import CRUDBase
-from app.models.models import Application, BranchSetting
+from app.crud.base import AsyncCRUDBase, CRUDBase
+from app.models.models import Application
 from app.schemas.application import ApplicationCreate
 
-# Import branch CRUD to find branch by slug
+# Import branch CRUD to resolve branch_key through the branch registry
 from .crud_branch import branch as crud_branch # Renamed to avoid conflict
+from .crud_branch import async_branch as async_crud_branch
 
 # BaseModel'i import etmemiz gerekebilir, çünkü CRUDBase generic'inde kullanılıyor
 from pydantic import BaseModel
 
 class CRUDApplication(CRUDBase[Application, ApplicationCreate, BaseModel]): # Using dummy Update schema
+    cursor_field = "submitted_at"
 
     def get_multi_by_branch(
-        self, db: Session, *, branch_id: Optional[int], skip: int = 0, limit: int = 100
+        self, db: Session, *, branch_id: Optional[int], skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[Application]:
-        """Get applications for a specific branch (or all if branch_id is None - for superuser)."""
+        """
+        Get applications for a specific branch (or all if branch_id is None - for superuser).
+        With a cursor (see next_cursor) skip is ignored and the page starts after the cursor row.
+        """
         statement = select(self.model)
         if branch_id is not None:
-            # Use db.get directly to fetch the branch by its primary key (id)
-            branch_obj: Optional[BranchSetting] = db.get(BranchSetting, branch_id)
-            if branch_obj:
-                 # Filter applications based on the branch SLUG found
-                statement = statement.where(self.model.branch_key == branch_obj.slug)
-            else:
-                # If branch not found, return empty list
-                return []
-        statement = statement.order_by(self.model.submitted_at.desc()).offset(skip).limit(limit)
+            statement = statement.where(self.model.branch_id == branch_id)
+        statement = self.apply_cursor(statement, cursor=cursor)
+        if not cursor:
+            statement = statement.offset(skip)
+        statement = statement.limit(limit)
         # Use session.execute and scalars for SQLModel/SQLAlchemy 2.0+
         results = db.execute(statement)
         return results.scalars().all()
@@ -36,25 +39,51 @@ class CRUDApplication(CRUDBase[Application, ApplicationCreate, BaseModel]): # Us
     def create_with_cv_path(self, db: Session, *, obj_in: ApplicationCreate, cv_file_path: str) -> Optional[Application]:
         """Creates an application after validating the branch_key and saving the CV path."""
         # Assuming branch_key from frontend corresponds to BranchSetting.slug
-        branch_obj = crud_branch.get_by_slug(db, slug=obj_in.branch_key)
+        branch_obj = crud_branch.get_info_by_slug(db, slug=obj_in.branch_key)
         if not branch_obj:
              # Consider raising an HTTPException(404, "Branch not found") here
             return None
             
         # Create the application object including the cv_file_path
         application_data = obj_in.model_dump() 
-        db_obj = self.model(**application_data, cv_file_path=cv_file_path)
-         # Set the found branch_id (or keep branch_key? Check model relation)
-        # If Application model links via branch_id, set it:
-        # db_obj.branch_id = branch_obj.id 
-        
+        db_obj = self.model(**application_data, cv_file_path=cv_file_path, branch_id=branch_obj.id)
+
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
+        return db_obj
+
+
+class AsyncCRUDApplication(AsyncCRUDBase[Application, ApplicationCreate, BaseModel]):
+
+    async def get_cv_location(self, db: AsyncSession, *, id: int) -> Optional[Tuple[str, Optional[int]]]:
+        """(cv_file_path, branch_id) of an application: everything a CV download needs, in one narrow query."""
+        statement = select(self.model.cv_file_path, self.model.branch_id).where(self.model.id == id)
+        row = (await db.execute(statement)).first()
+        return (row[0], row[1]) if row else None
+
+    async def build_with_cv_path(
+        self, db: AsyncSession, *, obj_in: ApplicationCreate, cv_file_path: str
+    ) -> Optional[Application]:
+        """Validates the branch_key and returns the application, not yet added to the session."""
+        branch_obj = await async_crud_branch.get_info_by_slug(db, slug=obj_in.branch_key)
+        if not branch_obj:
+            return None
+        return self.model(**obj_in.model_dump(), cv_file_path=cv_file_path, branch_id=branch_obj.id)
+
+    async def create_with_cv_path(
+        self, db: AsyncSession, *, obj_in: ApplicationCreate, cv_file_path: str
+    ) -> Optional[Application]:
+        """Creates an application after validating the branch_key and saving the CV path."""
+        db_obj = await self.build_with_cv_path(db, obj_in=obj_in, cv_file_path=cv_file_path)
+        if not db_obj:
+            return None
+        db.add(db_obj)
+        await db.commit()
         return db_obj
 
 # Create an instance
 application = CRUDApplication(Application)
+async_application = AsyncCRUDApplication(Application)
 
 # Below functions might be redundant if using the CRUD class instance
 # def get_application(db: Session, application_id: int) -> Optional[Application]:
@@ -1,10 +1,70 @@
 from typing import Any, Dict, Optional, Union, List
 
+from sqlalchemy import String, cast, literal, or_, text, update
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.crud.base import CRUDBase
-from app.models.models import BranchSetting
+from app.core.branch_registry import BranchInfo, branch_registry
+from app.core.cache import invalidate_table_views, invalidate_user_principals
+from app.core.config import settings
+from app.crud.base import AsyncCRUDBase, CRUDBase
+from app.crud.crud_reservation_slot import SLOT_FIELDS, async_reservation_slot, reservation_slot
+from app.models.models import BranchSetting, ManagedTable
 from app.schemas.branch import BranchSettingCreate, BranchSettingUpdate
+from app.utils.links import table_link_prefix
+
+
+def regenerate_table_links_statement(*, branch_id: int, branch_slug: str):
+    """
+    Set-based rewrite of every default (non-overridden) table link of a branch to a new slug:
+    UPDATE managedtable SET link = '<prefix>' || table_number WHERE branch_id = ... AND no override.
+    """
+    return (
+        update(ManagedTable)
+        .where(
+            ManagedTable.branch_id == branch_id,
+            or_(ManagedTable.override_main_qr_link.is_(None), ManagedTable.override_main_qr_link == ""),
+        )
+        .values(link=literal(table_link_prefix(branch_slug), String) + cast(ManagedTable.table_number, String))
+        # Loaded ManagedTable objects get the new link from UPDATE ... RETURNING (sessions don't expire on commit)
+        .execution_options(synchronize_session="fetch")
+    )
+
+
+BRANCH_EVENTS_CHANNEL = "branch_registry"
+
+
+def branch_changed_statement(db: Union[Session, AsyncSession], *, branch_id: Optional[int] = None):
+    """
+    NOTIFY for the other workers (app.db.branch_events), sent by Postgres when the transaction commits.
+    The payload is the branch id, empty for "reload everything". None if BRANCH_REGISTRY_NOTIFY is off.
+    """
+    if not settings.BRANCH_REGISTRY_NOTIFY or db.get_bind().dialect.name != "postgresql":
+        return None
+    return text("SELECT pg_notify(:channel, :payload)").bindparams(
+        channel=BRANCH_EVENTS_CHANNEL, payload="" if branch_id is None else str(branch_id)
+    )
+
+
+def _new_slug(db_obj: BranchSetting, obj_in: Union[BranchSettingUpdate, Dict[str, Any]]) -> Optional[str]:
+    update_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+    new_slug = update_data.get("slug")
+    return new_slug if new_slug and new_slug != db_obj.slug else None
+
+
+def _new_slot_settings(
+    db_obj: BranchSetting, obj_in: Union[BranchSettingUpdate, Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """Capacity, grid start and slot length after the update, if it changes any of them (counters rebuild)."""
+    update_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+    if all(field not in update_data or update_data[field] == getattr(db_obj, field) for field in SLOT_FIELDS):
+        return None
+    new = {field: update_data.get(field, getattr(db_obj, field)) for field in SLOT_FIELDS}
+    return {
+        "capacity": new["reservation_capacity"],
+        "opens_at": new["reservation_opens_at"],
+        "slot_minutes": new["reservation_slot_minutes"],
+    }
 
 
 class CRUDBranch(CRUDBase[BranchSetting, BranchSettingCreate, BranchSettingUpdate]):
@@ -13,6 +73,21 @@ class CRUDBranch(CRUDBase[BranchSetting, BranchSettingCreate, BranchSettingUpdat
         statement = select(self.model).where(self.model.slug == slug)
         return db.execute(statement).scalars().first()
 
+    def get_info_by_slug(self, db: Session, *, slug: str) -> Optional[BranchInfo]:
+        """
+        Branch key validation for public submissions, served from the branch registry.
+        Queries only when the registry is due for a reload or the slug is unknown
+        (a branch created by another worker).
+        """
+        if branch_registry.is_stale:
+            branch_registry.replace_all(db.execute(select(self.model)).scalars().all())
+            return branch_registry.get(slug)
+        info = branch_registry.get(slug)
+        if info is None:
+            branch_obj = self.get_by_slug(db, slug=slug)
+            info = branch_registry.put(branch_obj) if branch_obj else None
+        return info
+
     def get_by_id_or_slug(self, db: Session, *, id_or_slug: Union[int, str]) -> Optional[BranchSetting]:
         branch_id: Optional[int] = None
         branch_slug: Optional[str] = None
@@ -57,10 +132,85 @@ class CRUDBranch(CRUDBase[BranchSetting, BranchSettingCreate, BranchSettingUpdat
         # Let's assume it returns model instances based on `select(self.model)`
         return results.scalars().all() 
 
-    # create and update methods are inherited from CRUDBase
+    def create(self, db: Session, *, obj_in: BranchSettingCreate) -> BranchSetting:
+        notify = branch_changed_statement(db)
+        if notify is not None:
+            db.execute(notify)
+        db_obj = super().create(db, obj_in=obj_in)
+        branch_registry.put(db_obj)
+        return db_obj
+
+    def update(
+        self, db: Session, *, db_obj: BranchSetting, obj_in: Union[BranchSettingUpdate, Dict[str, Any]]
+    ) -> BranchSetting:
+        new_slug = _new_slug(db_obj, obj_in)
+        if new_slug:
+            # Same transaction as the branch row: one UPDATE for all tables, committed by super().update
+            db.execute(regenerate_table_links_statement(branch_id=db_obj.id, branch_slug=new_slug))
+        slot_settings = _new_slot_settings(db_obj, obj_in)
+        if slot_settings:
+            reservation_slot.rebuild(db, branch_id=db_obj.id, **slot_settings)
+        notify = branch_changed_statement(db, branch_id=db_obj.id)
+        if notify is not None:
+            db.execute(notify)
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        branch_registry.put(db_obj)
+        # Links, labels order and WhatsApp number feed every table view of this branch
+        invalidate_table_views(branch_id=db_obj.id)
+        if new_slug:
+            # Cached principals carry the branch slug
+            invalidate_user_principals(branch_id=db_obj.id)
+        return db_obj
+
+
+class AsyncCRUDBranch(AsyncCRUDBase[BranchSetting, BranchSettingCreate, BranchSettingUpdate]):
+
+    async def get_by_slug(self, db: AsyncSession, *, slug: str) -> Optional[BranchSetting]:
+        statement = select(self.model).where(self.model.slug == slug)
+        results = await db.execute(statement)
+        return results.scalars().first()
+
+    async def get_info_by_slug(self, db: AsyncSession, *, slug: str) -> Optional[BranchInfo]:
+        """Branch key validation for public submissions, served from the branch registry (see CRUDBranch)."""
+        if branch_registry.is_stale:
+            branch_registry.replace_all((await db.execute(select(self.model))).scalars().all())
+            return branch_registry.get(slug)
+        info = branch_registry.get(slug)
+        if info is None:
+            branch_obj = await self.get_by_slug(db, slug=slug)
+            info = branch_registry.put(branch_obj) if branch_obj else None
+        return info
+
+    async def create(self, db: AsyncSession, *, obj_in: BranchSettingCreate) -> BranchSetting:
+        notify = branch_changed_statement(db)
+        if notify is not None:
+            await db.execute(notify)
+        db_obj = await super().create(db, obj_in=obj_in)
+        branch_registry.put(db_obj)
+        return db_obj
+
+    async def update(
+        self, db: AsyncSession, *, db_obj: BranchSetting, obj_in: Union[BranchSettingUpdate, Dict[str, Any]]
+    ) -> BranchSetting:
+        new_slug = _new_slug(db_obj, obj_in)
+        if new_slug:
+            await db.execute(regenerate_table_links_statement(branch_id=db_obj.id, branch_slug=new_slug))
+        slot_settings = _new_slot_settings(db_obj, obj_in)
+        if slot_settings:
+            await async_reservation_slot.rebuild(db, branch_id=db_obj.id, **slot_settings)
+        notify = branch_changed_statement(db, branch_id=db_obj.id)
+        if notify is not None:
+            await db.execute(notify)
+        db_obj = await super().update(db, db_obj=db_obj, obj_in=obj_in)
+        branch_registry.put(db_obj)
+        invalidate_table_views(branch_id=db_obj.id)
+        if new_slug:
+            invalidate_user_principals(branch_id=db_obj.id)
+        return db_obj
 
 # Create an instance
 branch = CRUDBranch(BranchSetting)
+async_branch = AsyncCRUDBranch(BranchSetting)
 
 # Standalone functions below might be redundant now
 # def get_branch(db: Session, branch_id: int) -> Optional[BranchSetting]:
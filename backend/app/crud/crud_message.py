@@ -1,47 +1,78 @@
 from typing import Any, Dict, Optional, Union, List
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from pydantic import BaseModel
 
-from app.crud.base import CRUDBase
-from app.models.models import Message, BranchSetting
+from app.crud.base import AsyncCRUDBase, CRUDBase
+from app.models.models import Message
+
+# Import branch CRUD to resolve branch_key to branch_id (through the branch registry)
+from .crud_branch import branch as crud_branch
+from .crud_branch import async_branch as async_crud_branch
 from app.schemas.message import MessageCreate
 
 
 class CRUDMessage(CRUDBase[Message, MessageCreate, BaseModel]): # UpdateSchema is dummy
-    # get, get_multi, create are inherited and sufficient
-    # No special methods needed for messages unless filtering is required
+    cursor_field = "received_at"
+
+    def create(self, db: Session, *, obj_in: MessageCreate) -> Message:
+        """Creates a message, linking it to the branch whose slug is branch_key (if any)."""
+        branch_obj = crud_branch.get_info_by_slug(db, slug=obj_in.branch_key)
+        db_obj = Message.model_validate(obj_in)
+        db_obj.branch_id = branch_obj.id if branch_obj else None
+        db.add(db_obj)
+        db.commit()
+        return db_obj
+
     def get_multi(
         self,
         db: Session, 
         *, 
         branch_id: Optional[int] = None,
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[Message]:
         """
         Retrieve messages.
-        If branch_id is provided, filters messages by that branch's key.
-        Orders by received_at desc.
+        If branch_id is provided, filters messages by that branch.
+        Orders by (received_at, id) desc; with a cursor, skip is ignored (keyset pagination).
         """
         statement = select(self.model)
 
         if branch_id is not None:
-            # Get the slug for the given branch_id
-            branch = db.get(BranchSetting, branch_id)
-            if branch:
-                statement = statement.where(self.model.branch_key == branch.slug)
-            else:
-                # If branch_id is given but not found, return empty list
-                return [] 
-
-        statement = statement.order_by(self.model.received_at.desc()).offset(skip).limit(limit)
+            statement = statement.where(self.model.branch_id == branch_id)
+
+        statement = self.apply_cursor(statement, cursor=cursor)
+        if not cursor:
+            statement = statement.offset(skip)
+        statement = statement.limit(limit)
         
         results = db.execute(statement)
         return results.scalars().all()
 
+
+class AsyncCRUDMessage(AsyncCRUDBase[Message, MessageCreate, BaseModel]):
+    # Listing stays on the sync CRUDMessage for now
+
+    async def build(self, db: AsyncSession, *, obj_in: MessageCreate) -> Message:
+        """The message linked to the branch whose slug is branch_key (if any), not yet added to the session."""
+        branch_obj = await async_crud_branch.get_info_by_slug(db, slug=obj_in.branch_key)
+        db_obj = Message.model_validate(obj_in)
+        db_obj.branch_id = branch_obj.id if branch_obj else None
+        return db_obj
+
+    async def create(self, db: AsyncSession, *, obj_in: MessageCreate) -> Message:
+        """Creates a message, linking it to the branch whose slug is branch_key (if any)."""
+        db_obj = await self.build(db, obj_in=obj_in)
+        db.add(db_obj)
+        await db.commit()
+        return db_obj
+
 # Create an instance
 message = CRUDMessage(Message)
+async_message = AsyncCRUDMessage(Message)
 
 # Below functions might be redundant if using the CRUD class instance
 # def get_message(db: Session, message_id: int) -> Optional[Message]:
@@ -1,64 +1,113 @@
 from typing import Any, Dict, Optional, Union, List
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.crud.base import CRUDBase
-from app.models.models import Reservation, BranchSetting
+from app.crud.base import AsyncCRUDBase, CRUDBase
+from app.models.models import Reservation, ReservationStatus
 from app.schemas.reservation import ReservationCreate, ReservationUpdate
 
-# Import branch CRUD to find branch by slug
+# Import branch CRUD to resolve branch_key through the branch registry
 from .crud_branch import branch as crud_branch # Renamed to avoid conflict
+from .crud_branch import async_branch as async_crud_branch
+from .crud_reservation_slot import async_reservation_slot, reservation_slot
 
 class CRUDReservation(CRUDBase[Reservation, ReservationCreate, ReservationUpdate]):
+    cursor_field = "received_at"
 
     def get_multi_by_branch(
-        self, db: Session, *, branch_id: Optional[int], skip: int = 0, limit: int = 100
+        self, db: Session, *, branch_id: Optional[int], skip: int = 0, limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[Reservation]:
-        """Get reservations for a specific branch (or all if branch_id is None - for superuser)."""
+        """
+        Get reservations for a specific branch (or all if branch_id is None - for superuser).
+        With a cursor (see next_cursor) skip is ignored and the page starts after the cursor row.
+        """
         statement = select(self.model)
         if branch_id is not None:
-            # Use db.get directly to fetch the branch by its primary key (id)
-            branch_obj: Optional[BranchSetting] = db.get(BranchSetting, branch_id)
-            if branch_obj:
-                # Filter reservations based on the branch SLUG found
-                statement = statement.where(Reservation.branch_key == branch_obj.slug)
-            else:
-                # If branch not found, return empty list
-                return []
-        statement = statement.order_by(self.model.received_at.desc()).offset(skip).limit(limit)
+            statement = statement.where(Reservation.branch_id == branch_id)
+        statement = self.apply_cursor(statement, cursor=cursor)
+        if not cursor:
+            statement = statement.offset(skip)
+        statement = statement.limit(limit)
         # Use session.execute and scalars for SQLModel/SQLAlchemy 2.0+
         results = db.execute(statement)
         return results.scalars().all()
 
     def create_with_branch_key_check(self, db: Session, *, obj_in: ReservationCreate) -> Optional[Reservation]:
-        """Creates a reservation after validating the branch_key."""
+        """
+        Creates a reservation after validating the branch_key.
+        Raises SlotFullError if the branch has a capacity and the slot cannot take the guests.
+        """
         # Assuming branch_key from frontend corresponds to BranchSetting.slug
-        branch_obj = crud_branch.get_by_slug(db, slug=obj_in.branch_key)
+        branch_obj = crud_branch.get_info_by_slug(db, slug=obj_in.branch_key)
         if not branch_obj:
             # Consider raising an HTTPException(404, "Branch not found") here
             return None 
         # Create the reservation object
         db_obj = Reservation.model_validate(obj_in)
-        # Set the found branch_id (or keep branch_key? Check model relation)
-        # If Reservation model links via branch_id, set it:
-        # db_obj.branch_id = branch_obj.id 
+        db_obj.branch_id = branch_obj.id
+        # Same transaction: the slot counter never disagrees with the reservations
+        reservation_slot.book(
+            db, branch_id=branch_obj.id, reservation_date=db_obj.reservation_date,
+            reservation_time=db_obj.reservation_time, guests=db_obj.guest_count,
+        )
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
 
     def update_status(
         self, db: Session, *, db_obj: Reservation, obj_in: ReservationUpdate
     ) -> Reservation:
-        """Updates the status of a reservation."""
+        """Updates the status of a reservation; cancelling frees its guests in the slot counter."""
         # Update only the status field
         update_data = obj_in.model_dump(exclude_unset=True)
+        was_cancelled = db_obj.status == ReservationStatus.CANCELLED
         for key, value in update_data.items():
             setattr(db_obj, key, value)
         db.add(db_obj)
+        is_cancelled = db_obj.status == ReservationStatus.CANCELLED
+        if was_cancelled != is_cancelled and db_obj.branch_id is not None:
+            reservation_slot.add_guests(
+                db, branch_id=db_obj.branch_id, reservation_date=db_obj.reservation_date,
+                reservation_time=db_obj.reservation_time,
+                guests=-db_obj.guest_count if is_cancelled else db_obj.guest_count,
+            )
         db.commit()
-        db.refresh(db_obj)
+        return db_obj
+
+
+class AsyncCRUDReservation(AsyncCRUDBase[Reservation, ReservationCreate, ReservationUpdate]):
+
+    async def build_with_branch_key_check(
+        self, db: AsyncSession, *, obj_in: ReservationCreate
+    ) -> Optional[Reservation]:
+        """Validates the branch_key and returns the reservation, not yet added to the session."""
+        branch_obj = await async_crud_branch.get_info_by_slug(db, slug=obj_in.branch_key)
+        if not branch_obj:
+            return None
+        db_obj = Reservation.model_validate(obj_in)
+        db_obj.branch_id = branch_obj.id
+        return db_obj
+
+    async def create_with_branch_key_check(
+        self, db: AsyncSession, *, obj_in: ReservationCreate
+    ) -> Optional[Reservation]:
+        """Creates a reservation after validating the branch_key; SlotFullError if its slot is full."""
+        branch_obj = await async_crud_branch.get_info_by_slug(db, slug=obj_in.branch_key)
+        if not branch_obj:
+            return None
+        db_obj = Reservation.model_validate(obj_in)
+        db_obj.branch_id = branch_obj.id
+        await async_reservation_slot.book(
+            db, branch_id=branch_obj.id, reservation_date=db_obj.reservation_date,
+            reservation_time=db_obj.reservation_time, guests=db_obj.guest_count,
+        )
+        db.add(db_obj)
+        await db.commit()
         return db_obj
 
 # Create an instance
-reservation = CRUDReservation(Reservation) 
\ No newline at end of file
+reservation = CRUDReservation(Reservation)
+async_reservation = AsyncCRUDReservation(Reservation)
+ 
\ No newline at end of file
@@ -0,0 +1,230 @@
+from datetime import date, time
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import delete, func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.crud.base import AsyncCRUDBase, CRUDBase
+from app.models.models import BranchSetting, Reservation, ReservationSlot, ReservationStatus
+from app.utils.slots import in_slot_grid, slot_start
+
+# BranchSetting fields the counters depend on: changing any of them rebuilds the branch's counters
+SLOT_FIELDS = ("reservation_capacity", "reservation_slot_minutes", "reservation_opens_at")
+
+
+class SlotFullError(Exception):
+    """The reservation's slot has no room left for its guests."""
+
+
+class SlotClosedError(Exception):
+    """The reservation time is outside the branch's slot grid (before opens_at or after the last slot)."""
+
+
+def slot_settings_statement(branch_id: int, *, for_share: bool = False):
+    """
+    Capacity and slot grid of a branch, from branchsetting itself (the branch registry can lag behind).
+    for_share: SELECT ... FOR SHARE in a booking transaction. Bookings don't block each other, but a
+    settings change (rebuild locks the row FOR UPDATE) waits for them, and they wait for it and then
+    see the new settings and the rebuilt counters.
+    """
+    statement = select(
+        BranchSetting.id, BranchSetting.reservation_capacity, BranchSetting.reservation_slot_minutes,
+        BranchSetting.reservation_opens_at, BranchSetting.reservation_last_slot_at,
+    ).where(BranchSetting.id == branch_id)
+    return statement.with_for_update(read=True) if for_share else statement
+
+
+def add_guests_statement(
+    dialect_name: str, *, branch: Any, reservation_date: date, reservation_time: time, guests: int,
+    capacity: Optional[int] = None,
+):
+    """
+    Moves one slot counter by guests (negative for a cancellation), creating it if needed:
+    INSERT ... ON CONFLICT (branch_id, slot_date, slot_time) DO UPDATE SET booked_guests = booked_guests + :guests
+    [WHERE booked_guests + :guests <= :capacity] RETURNING booked_guests.
+    With a capacity no row comes back when the guests don't fit. The database locks and re-reads the
+    conflicting row, so concurrent bookings of one slot queue on that row alone: no overbooking, and
+    bookings of other slots don't wait. `branch` is a BranchSetting or a slot_settings_statement row.
+    """
+    upsert = pg_insert if dialect_name == "postgresql" else sqlite_insert
+    statement = upsert(ReservationSlot).values(
+        branch_id=branch.id,
+        slot_date=reservation_date,
+        slot_time=slot_start(
+            reservation_time, opens_at=branch.reservation_opens_at, slot_minutes=branch.reservation_slot_minutes
+        ),
+        booked_guests=guests,
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[ReservationSlot.branch_id, ReservationSlot.slot_date, ReservationSlot.slot_time],
+        set_={"booked_guests": ReservationSlot.booked_guests + statement.excluded.booked_guests},
+        where=None if capacity is None else ReservationSlot.booked_guests + statement.excluded.booked_guests <= capacity,
+    ).returning(ReservationSlot.booked_guests)
+
+
+def set_guests_statement(dialect_name: str, rows: List[Dict[str, Any]]):
+    """Overwrites (or creates) slot counters with recounted values: rows as built by slot_rows."""
+    upsert = pg_insert if dialect_name == "postgresql" else sqlite_insert
+    statement = upsert(ReservationSlot).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[ReservationSlot.branch_id, ReservationSlot.slot_date, ReservationSlot.slot_time],
+        set_={"booked_guests": statement.excluded.booked_guests},
+    )
+
+
+def booked_guests_statement(branch_id: int):
+    """Guests per (date, time) of a branch's reservations that still count (not cancelled)."""
+    return (
+        select(Reservation.reservation_date, Reservation.reservation_time, func.sum(Reservation.guest_count))
+        .where(Reservation.branch_id == branch_id, Reservation.status != ReservationStatus.CANCELLED)
+        .group_by(Reservation.reservation_date, Reservation.reservation_time)
+    )
+
+
+def slot_rows(
+    *, branch_id: int, opens_at: time, slot_minutes: int, booked: List[Tuple[date, time, int]]
+) -> List[Dict[str, Any]]:
+    """Counter rows for the output of booked_guests_statement on a (possibly new) slot grid."""
+    totals: Dict[Tuple[date, time], int] = {}
+    for reservation_date, reservation_time, guests in booked:
+        key = (reservation_date, slot_start(reservation_time, opens_at=opens_at, slot_minutes=slot_minutes))
+        totals[key] = totals.get(key, 0) + int(guests)
+    return [
+        {"branch_id": branch_id, "slot_date": slot_date, "slot_time": slot_time, "booked_guests": guests}
+        for (slot_date, slot_time), guests in totals.items()
+    ]
+
+
+class CRUDReservationSlot(CRUDBase[ReservationSlot, BaseModel, BaseModel]):
+    """
+    Slot counters of capacity-limited branches. Nothing here commits: every change runs in the
+    transaction of the reservation (or branch) write that caused it.
+    """
+
+    def book(self, db: Session, *, branch_id: int, reservation_date: date, reservation_time: time, guests: int) -> None:
+        """
+        Takes guests from their slot in one conditional upsert, before the reservation is written.
+        Capacity and grid are read FOR SHARE in the same transaction (see slot_settings_statement).
+        Raises SlotFullError (transaction rolled back, slot row unlocked) when they don't fit, and
+        SlotClosedError when the time is not in any slot.
+        """
+        branch = db.execute(slot_settings_statement(branch_id, for_share=True)).first()
+        if branch is None or branch.reservation_capacity is None:
+            return
+        capacity = branch.reservation_capacity
+        if not in_slot_grid(
+            reservation_time, opens_at=branch.reservation_opens_at,
+            last_slot_at=branch.reservation_last_slot_at, slot_minutes=branch.reservation_slot_minutes,
+        ):
+            db.rollback()
+            raise SlotClosedError()
+        booked = None if guests > capacity else db.execute(add_guests_statement(
+            db.get_bind().dialect.name, branch=branch,
+            reservation_date=reservation_date, reservation_time=reservation_time, guests=guests, capacity=capacity,
+        )).first()
+        if booked is None:
+            db.rollback()
+            raise SlotFullError()
+
+    def add_guests(
+        self, db: Session, *, branch_id: int, reservation_date: date, reservation_time: time, guests: int
+    ) -> None:
+        """Unconditional move, for cancellations and staff restoring a cancelled reservation."""
+        branch = db.execute(slot_settings_statement(branch_id, for_share=True)).first()
+        if branch is None or branch.reservation_capacity is None:
+            return # Unlimited branches keep no counters
+        db.execute(add_guests_statement(
+            db.get_bind().dialect.name, branch=branch,
+            reservation_date=reservation_date, reservation_time=reservation_time, guests=guests,
+        ))
+
+    def rebuild(
+        self, db: Session, *, branch_id: int, capacity: Optional[int], opens_at: time, slot_minutes: int
+    ) -> None:
+        """
+        Recomputes a branch's counters from its reservations (or drops them when capacity is lifted).
+        For capacity and slot grid changes, in their transaction. Locks the branch row first (FOR NO KEY
+        UPDATE, as the UPDATE itself would), so no booking (which holds it FOR SHARE) commits between the
+        recount and the settings change; foreign key checks of plain inserts are not blocked.
+        """
+        db.execute(select(BranchSetting.id).where(BranchSetting.id == branch_id).with_for_update(key_share=True))
+        db.execute(delete(ReservationSlot).where(ReservationSlot.branch_id == branch_id))
+        if capacity is None:
+            return
+        rows = slot_rows(
+            branch_id=branch_id, opens_at=opens_at, slot_minutes=slot_minutes,
+            booked=db.execute(booked_guests_statement(branch_id)).all(),
+        )
+        if rows:
+            db.execute(insert(ReservationSlot), rows)
+
+
+class AsyncCRUDReservationSlot(AsyncCRUDBase[ReservationSlot, BaseModel, BaseModel]):
+
+    async def book(
+        self, db: AsyncSession, *, branch_id: int, reservation_date: date, reservation_time: time, guests: int
+    ) -> None:
+        """Takes guests from their slot or raises SlotFullError / SlotClosedError (see CRUDReservationSlot.book)."""
+        branch = (await db.execute(slot_settings_statement(branch_id, for_share=True))).first()
+        if branch is None or branch.reservation_capacity is None:
+            return
+        capacity = branch.reservation_capacity
+        if not in_slot_grid(
+            reservation_time, opens_at=branch.reservation_opens_at,
+            last_slot_at=branch.reservation_last_slot_at, slot_minutes=branch.reservation_slot_minutes,
+        ):
+            await db.rollback()
+            raise SlotClosedError()
+        booked = None if guests > capacity else (await db.execute(add_guests_statement(
+            db.get_bind().dialect.name, branch=branch,
+            reservation_date=reservation_date, reservation_time=reservation_time, guests=guests, capacity=capacity,
+        ))).first()
+        if booked is None:
+            await db.rollback()
+            raise SlotFullError()
+
+    async def add_guests(
+        self, db: AsyncSession, *, branch_id: int, reservation_date: date, reservation_time: time, guests: int
+    ) -> None:
+        branch = (await db.execute(slot_settings_statement(branch_id, for_share=True))).first()
+        if branch is None or branch.reservation_capacity is None:
+            return
+        await db.execute(add_guests_statement(
+            db.get_bind().dialect.name, branch=branch,
+            reservation_date=reservation_date, reservation_time=reservation_time, guests=guests,
+        ))
+
+    async def rebuild(
+        self, db: AsyncSession, *, branch_id: int, capacity: Optional[int], opens_at: time, slot_minutes: int
+    ) -> None:
+        """Recomputes a branch's counters from its reservations (see CRUDReservationSlot.rebuild)."""
+        await db.execute(select(BranchSetting.id).where(BranchSetting.id == branch_id).with_for_update(key_share=True))
+        await db.execute(delete(ReservationSlot).where(ReservationSlot.branch_id == branch_id))
+        if capacity is None:
+            return
+        rows = slot_rows(
+            branch_id=branch_id, opens_at=opens_at, slot_minutes=slot_minutes,
+            booked=(await db.execute(booked_guests_statement(branch_id))).all(),
+        )
+        if rows:
+            await db.execute(insert(ReservationSlot), rows)
+
+    async def has_capacity(self, db: AsyncSession, *, branch_id: int) -> bool:
+        """Whether the branch limits reservations, read from the database: one primary key lookup."""
+        settings = (await db.execute(slot_settings_statement(branch_id))).first()
+        return settings is not None and settings.reservation_capacity is not None
+
+    async def get_booked(self, db: AsyncSession, *, branch_id: int, slot_date: date) -> Dict[time, int]:
+        """Booked guests per slot start of one branch and date: a primary key range read."""
+        statement = select(ReservationSlot.slot_time, ReservationSlot.booked_guests).where(
+            ReservationSlot.branch_id == branch_id, ReservationSlot.slot_date == slot_date
+        )
+        return {slot_time: booked for slot_time, booked in (await db.execute(statement)).all()}
+
+# Create an instance
+reservation_slot = CRUDReservationSlot(ReservationSlot)
+async_reservation_slot = AsyncCRUDReservationSlot(ReservationSlot)
@@ -1,24 +1,41 @@
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Dict, Optional, Union, List, Tuple
 
-from sqlmodel import Session, select
+from sqlalchemy import delete, insert
+from sqlmodel import Session, and_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import joinedload
 
-from app.crud.base import CRUDBase
+from app.crud.base import AsyncCRUDBase, CRUDBase
 from app.models.models import ManagedTable, BranchSetting
 from app.schemas.table import ManagedTableCreate, ManagedTableUpdate, ManagedTableBulkCreate
-from app.core.config import settings
+from app.core.cache import invalidate_table_views
+from app.utils.links import build_table_link
 
 # Import branch CRUD
 from .crud_branch import branch as crud_branch
 
+def table_with_branch_statement(*, branch_slug: str, table_number: int):
+    """
+    One SELECT for (branch, table) keyed on (slug, table_number).
+    LEFT JOIN so a missing table still returns the branch row (branch found, table None).
+    Served by ix_branchsetting_slug + uq_managedtable_branch_id_table_number.
+    """
+    return (
+        select(BranchSetting, ManagedTable)
+        .outerjoin(ManagedTable, and_(
+            ManagedTable.branch_id == BranchSetting.id,
+            ManagedTable.table_number == table_number,
+        ))
+        .where(BranchSetting.slug == branch_slug)
+        .limit(1)
+    )
+
+
 class CRUDManagedTable(CRUDBase[ManagedTable, ManagedTableCreate, ManagedTableUpdate]):
 
     def generate_default_table_link(self, branch_slug: str, table_number: int) -> str:
         """Generates the default QR code link for a table using the new URL structure."""
-        # Ensure BASE_URL is the frontend URL (e.g., https://positive-tranquility-production.up.railway.app)
-        base_url = settings.BASE_URL.rstrip('/') 
-        # Use the new path structure
-        return f"{base_url}/musteri/sube/{branch_slug}/table/{table_number}"
+        return build_table_link(branch_slug, table_number)
 
     def get_by_number_and_branch(
         self, db: Session, *, table_number: int, branch_id: int
@@ -29,6 +46,14 @@ class CRUDManagedTable(CRUDBase[ManagedTable, ManagedTableCreate, ManagedTableUp
         )
         return db.execute(statement).scalars().first()
 
+    def get_with_branch_by_slug(
+        self, db: Session, *, branch_slug: str, table_number: int
+    ) -> Tuple[Optional[BranchSetting], Optional[ManagedTable]]:
+        """Returns (branch, table); branch is None if the slug is unknown, table is None if the number is."""
+        statement = table_with_branch_statement(branch_slug=branch_slug, table_number=table_number)
+        row = db.execute(statement).first()
+        return (row[0], row[1]) if row else (None, None)
+
     def get_multi_by_branch(
         self, db: Session, *, branch_id: Optional[int], skip: int = 0, limit: int = 100
     ) -> List[ManagedTable]:
@@ -43,55 +68,104 @@ class CRUDManagedTable(CRUDBase[ManagedTable, ManagedTableCreate, ManagedTableUp
     def create_bulk(
         self, db: Session, *, tables_in: ManagedTableBulkCreate, branch: BranchSetting
     ) -> List[ManagedTable]:
-        """Creates tables in bulk for a given branch."""
-        created_tables = []
-        for table_num in range(tables_in.start_number, tables_in.end_number + 1):
-            existing = self.get_by_number_and_branch(db, table_number=table_num, branch_id=branch.id)
-            if not existing:
-                link = self.generate_default_table_link(branch_slug=branch.slug, table_number=table_num)
-                db_table = self.model(
-                    table_number=table_num,
-                    branch_id=branch.id,
-                    link=link,
-                )
-                db.add(db_table)
-                created_tables.append(db_table)
+        """
+        Creates the missing tables among tables_in.requested_numbers() for a branch.
+        One SELECT for the numbers that already exist, then one multi-row INSERT ... RETURNING.
+        Races with a concurrent request surface as IntegrityError (uq_managedtable_branch_id_table_number).
+        """
+        table_numbers = tables_in.requested_numbers()
+        branch_id = branch.id
+        existing_statement = select(self.model.table_number).where(
+            self.model.branch_id == branch_id,
+            self.model.table_number.in_(table_numbers)
+        )
+        existing = set(db.execute(existing_statement).scalars().all())
+        rows = [
+            {
+                "table_number": table_num,
+                "branch_id": branch_id,
+                "link": self.generate_default_table_link(branch_slug=branch.slug, table_number=table_num),
+            }
+            for table_num in table_numbers
+            if table_num not in existing
+        ]
+        if not rows:
+            return []
+        created_tables = db.scalars(
+            insert(self.model).returning(self.model, sort_by_parameter_order=True), rows
+        ).all()
+        # RETURNING already loaded every column and the session does not expire on commit: no refresh
         db.commit()
-        for table_obj in created_tables:
-            db.refresh(table_obj)
+        invalidate_table_views(
+            branch_id=branch_id, table_numbers=[row["table_number"] for row in rows]
+        )
         return created_tables
 
     def update_with_link_regen(
         self, db: Session, *, db_obj: ManagedTable, obj_in: ManagedTableUpdate, branch_slug: str
     ) -> ManagedTable:
-        """Updates a table, regenerating link if needed."""
-        # Use base update method first
-        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
-        
-        # Regenerate link based on potential override update
-        new_link = db_obj.override_main_qr_link or self.generate_default_table_link(
-            branch_slug=branch_slug, table_number=db_obj.table_number
+        """Updates a table, regenerating link if needed. One UPDATE and one commit."""
+        # Capture the number before the update in case table_number itself changes
+        old_table_number = db_obj.table_number
+        update_data = obj_in.model_dump(exclude_unset=True)
+        # Regenerate link from the values the row will have after the update
+        override_link = update_data.get("override_main_qr_link", db_obj.override_main_qr_link)
+        table_number = update_data.get("table_number", db_obj.table_number)
+        update_data["link"] = override_link or self.generate_default_table_link(
+            branch_slug=branch_slug, table_number=table_number
+        )
+        db_obj = super().update(db, db_obj=db_obj, obj_in=update_data)
+        invalidate_table_views(
+            branch_id=db_obj.branch_id,
+            table_ids=[db_obj.id],
+            table_numbers=[old_table_number, db_obj.table_number],
         )
-        if db_obj.link != new_link:
-             db_obj.link = new_link
-             db.add(db_obj) # Add again to mark as dirty
-             db.commit()
-             db.refresh(db_obj)
         return db_obj
 
-    def remove_bulk(self, db: Session, *, table_ids: List[int], branch_id: int) -> int:
-        """Removes tables by IDs, ensuring they belong to the correct branch. Returns count."""
+    def remove_bulk(self, db: Session, *, table_ids: List[int], branch_id: int) -> List[int]:
+        """
+        Removes tables by IDs, ensuring they belong to the correct branch.
+        Single DELETE ... RETURNING; returns the IDs that were actually deleted.
+        """
+        if not table_ids:
+            return []
+        statement = (
+            delete(self.model)
+            .where(
+                self.model.id.in_(table_ids),
+                self.model.branch_id == branch_id
+            )
+            .returning(self.model.id)
+            # Rows are not loaded into the session, nothing to synchronize
+            .execution_options(synchronize_session=False)
+        )
+        deleted_ids = list(db.execute(statement).scalars().all())
+        db.commit()
+        invalidate_table_views(branch_id=branch_id, table_ids=deleted_ids)
+        return deleted_ids
+
+
+class AsyncCRUDManagedTable(AsyncCRUDBase[ManagedTable, ManagedTableCreate, ManagedTableUpdate]):
+
+    async def get_by_number_and_branch(
+        self, db: AsyncSession, *, table_number: int, branch_id: int
+    ) -> Optional[ManagedTable]:
         statement = select(self.model).where(
-            self.model.id.in_(table_ids),
+            self.model.table_number == table_number,
             self.model.branch_id == branch_id
         )
-        tables_to_delete = db.execute(statement).scalars().all()
-        count = 0
-        for table_obj in tables_to_delete:
-            db.delete(table_obj)
-            count += 1
-        db.commit()
-        return count
+        results = await db.execute(statement)
+        return results.scalars().first()
+
+    async def get_with_branch_by_slug(
+        self, db: AsyncSession, *, branch_slug: str, table_number: int
+    ) -> Tuple[Optional[BranchSetting], Optional[ManagedTable]]:
+        """Returns (branch, table) in one round trip; see table_with_branch_statement."""
+        statement = table_with_branch_statement(branch_slug=branch_slug, table_number=table_number)
+        row = (await db.execute(statement)).first()
+        return (row[0], row[1]) if row else (None, None)
 
 # Create an instance
-table = CRUDManagedTable(ManagedTable) 
\ No newline at end of file
+table = CRUDManagedTable(ManagedTable)
+async_table = AsyncCRUDManagedTable(ManagedTable)
+ 
\ No newline at end of file
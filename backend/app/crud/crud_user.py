@@ -1,11 +1,14 @@
 from typing import Any, Dict, Optional, Union
 
+from sqlalchemy import case, or_
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
-from app.crud.base import CRUDBase
-from app.models.models import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.core.cache import invalidate_user_principals
+from app.core.security import DUMMY_PASSWORD_HASH, get_password_hash, verify_password
+from app.crud.base import AsyncCRUDBase, CRUDBase
+from app.models.models import BranchSetting, User
+from app.schemas.user import UserCreate, UserPrincipal, UserUpdate
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
@@ -19,6 +22,40 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         result = db.execute(statement)
         return result.scalars().first()
 
+    def get_by_email_or_username(self, db: Session, *, email: str, username: str) -> Optional[User]:
+        """
+        One query over both unique indexes: WHERE email = :email OR username = :username.
+        If two users match, the email match wins.
+        """
+        statement = (
+            select(self.model)
+            .where(or_(self.model.email == email, self.model.username == username))
+            .order_by(case((self.model.email == email, 0), else_=1))
+            .limit(1)
+        )
+        return db.execute(statement).scalars().first()
+
+    def get_principal(self, db: Session, *, id: int) -> Optional[UserPrincipal]:
+        """User plus its branch slug in one query (LEFT JOIN branchsetting)."""
+        statement = (
+            select(self.model, BranchSetting.slug)
+            .outerjoin(BranchSetting, self.model.branch_id == BranchSetting.id)
+            .where(self.model.id == id)
+        )
+        row = db.execute(statement).first()
+        if row is None:
+            return None
+        user, branch_slug = row
+        return UserPrincipal(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            branch_id=user.branch_id,
+            branch_slug=branch_slug,
+        )
+
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
         # Use model_validate for Pydantic V2
         db_obj = self.model.model_validate(
@@ -29,7 +66,6 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         # (model_validate should handle extra fields based on model definition)
         db.add(db_obj)
         db.commit()
-        db.refresh(db_obj)
         return db_obj
 
     def update(
@@ -46,19 +82,41 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
             
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        db_obj = super().update(db, db_obj=db_obj, obj_in=update_data)
+        invalidate_user_principals(user_id=db_obj.id)
+        return db_obj
+
+    def remove(self, db: Session, *, id: Any) -> Optional[User]:
+        obj = super().remove(db, id=id)
+        invalidate_user_principals(user_id=id)
+        return obj
 
     def authenticate(
         self, db: Session, *, username_or_email: str, password: str
     ) -> Optional[User]:
-        user = self.get_by_email(db, email=username_or_email)
-        if not user:
-            user = self.get_by_username(db, username=username_or_email)
+        user = self.get_by_email_or_username(db, email=username_or_email, username=username_or_email)
         if not user:
+            # Same bcrypt cost as a wrong password, so response time does not reveal unknown accounts
+            verify_password(password, DUMMY_PASSWORD_HASH)
             return None
         if not verify_password(password, user.hashed_password):
             return None
         return user
 
+
+class AsyncCRUDUser(AsyncCRUDBase[User, UserCreate, UserUpdate]):
+    # Lookups only: password hashing (create/update/authenticate) stays on the sync CRUDUser
+    async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
+        statement = select(self.model).where(self.model.email == email)
+        results = await db.execute(statement)
+        return results.scalars().first()
+
+    async def get_by_username(self, db: AsyncSession, *, username: str) -> Optional[User]:
+        statement = select(self.model).where(self.model.username == username)
+        results = await db.execute(statement)
+        return results.scalars().first()
+
 # Create an instance of the CRUD class for User model
-user = CRUDUser(User) 
\ No newline at end of file
+user = CRUDUser(User)
+async_user = AsyncCRUDUser(User)
+ 
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Keeps the branch registry (app.core.branch_registry) loaded and, with BRANCH_REGISTRY_NOTIFY,
+in sync across workers.
+
+Branch writes send `NOTIFY branch_registry, '<branch id>'` in their transaction (see
+crud_branch.branch_changed_statement). Every worker LISTENs on one dedicated connection of the
+async engine; a notification marks the registry stale and drops that branch's cached table
+views and principals, so the change is visible everywhere right after the commit instead of
+after BRANCH_REGISTRY_TTL_SECONDS / TABLE_VIEW_CACHE_TTL_SECONDS.
+"""
+import asyncio
+import logging
+from typing import Any, Optional
+
+from sqlmodel import select
+
+from app.core.branch_registry import branch_registry
+from app.core.cache import invalidate_table_views, invalidate_user_principals
+from app.core.config import settings
+from app.crud.crud_branch import BRANCH_EVENTS_CHANNEL
+from app.db.session import AsyncSessionLocal, async_engine
+from app.models.models import BranchSetting
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 5.0 # Seconds between attempts to re-establish a lost LISTEN connection
+
+_listener_task: Optional[asyncio.Task] = None
+
+
+def _on_branch_changed(connection: Any, pid: int, channel: str, payload: str) -> None:
+    # Called by asyncpg on the event loop; reloading is left to the next lookup
+    branch_registry.invalidate()
+    if payload:
+        branch_id = int(payload)
+        invalidate_table_views(branch_id=branch_id)
+        invalidate_user_principals(branch_id=branch_id)
+
+
+async def _listen() -> None:
+    while True:
+        try:
+            async with async_engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                pg = raw.driver_connection # asyncpg.Connection
+                lost = asyncio.Event()
+                pg.add_termination_listener(lambda _: lost.set())
+                await pg.add_listener(BRANCH_EVENTS_CHANNEL, _on_branch_changed)
+                # Anything sent while we were not listening is caught up by a reload
+                await load_branch_registry()
+                try:
+                    await lost.wait()
+                finally:
+                    if not pg.is_closed():
+                        await pg.remove_listener(BRANCH_EVENTS_CHANNEL, _on_branch_changed)
+            logger.warning("Branch registry LISTEN connection lost; reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Branch registry LISTEN failed; retrying in %.0fs", RECONNECT_DELAY)
+        await asyncio.sleep(RECONNECT_DELAY)
+
+
+async def load_branch_registry() -> None:
+    async with AsyncSessionLocal() as db:
+        branch_registry.replace_all((await db.execute(select(BranchSetting))).scalars().all())
+
+
+async def start_branch_events() -> None:
+    """Loads the registry up front and starts the LISTEN task if BRANCH_REGISTRY_NOTIFY is on."""
+    global _listener_task
+    try:
+        await load_branch_registry()
+    except Exception:
+        # Not fatal: the first lookup loads it
+        logger.exception("Could not load the branch registry at startup")
+    if settings.BRANCH_REGISTRY_NOTIFY:
+        if async_engine.dialect.name != "postgresql":
+            logger.warning("BRANCH_REGISTRY_NOTIFY needs PostgreSQL; relying on BRANCH_REGISTRY_TTL_SECONDS")
+            return
+        _listener_task = asyncio.create_task(_listen())
+
+
+async def stop_branch_events() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
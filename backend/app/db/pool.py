@@ -0,0 +1,179 @@
+import threading
+import time
+from typing import Any, Dict, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+# Upper bounds (ms) of the connection wait-time histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, float("inf"))
+
+
+class PoolStats:
+    """Counters fed by pool events and timed checkouts. Cheap enough to keep always on."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.liveness_pings = 0
+        self.timeouts = 0
+        self.statements = 0 # SQL statements sent on this engine's connections (BEGIN/COMMIT excluded)
+        self.peak_checked_out = 0
+        self.wait_count = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS_MS)
+
+    def record_wait(self, elapsed_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            self.wait_count += 1
+            self.wait_total_ms += elapsed_ms
+            self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def observe_checked_out(self, checked_out: int) -> None:
+        with self._lock:
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "liveness_pings": self.liveness_pings,
+                "timeouts": self.timeouts,
+                "statements": self.statements,
+                "peak_checked_out": self.peak_checked_out,
+                "wait": {
+                    "count": self.wait_count,
+                    "total_ms": round(self.wait_total_ms, 3),
+                    "mean_ms": round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else 0.0,
+                    "max_ms": round(self.wait_max_ms, 3),
+                    "buckets_ms": {
+                        ("+Inf" if bound == float("inf") else str(bound)): count
+                        for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)
+                    },
+                },
+            }
+
+
+def _timed(pool_cls: Type[QueuePool]) -> Type[QueuePool]:
+    """Subclasses a queue pool so every checkout records how long it waited for a connection."""
+
+    class TimedPool(pool_cls):  # type: ignore[misc, valid-type]
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            self.stats = PoolStats()
+
+        def recreate(self) -> "TimedPool":
+            new_pool = super().recreate()
+            new_pool.stats = self.stats # Keep history across pool.dispose()
+            return new_pool
+
+        def _do_get(self) -> Any:
+            start = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except exc.TimeoutError:
+                self.stats.record_wait((time.perf_counter() - start) * 1000, timed_out=True)
+                raise
+            self.stats.record_wait((time.perf_counter() - start) * 1000)
+            return conn
+
+    TimedPool.__name__ = f"Timed{pool_cls.__name__}"
+    return TimedPool
+
+
+TimedQueuePool = _timed(QueuePool)
+TimedAsyncAdaptedQueuePool = _timed(AsyncAdaptedQueuePool)
+
+
+def pool_options(*, is_async: bool = False) -> Dict[str, Any]:
+    """create_engine / create_async_engine keyword arguments driven by Settings."""
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        # Interval 0 keeps SQLAlchemy's ping-on-every-checkout behaviour
+        "pool_pre_ping": settings.DB_POOL_PRE_PING_INTERVAL == 0,
+    }
+
+
+def instrument_pool(engine: Engine) -> None:
+    """
+    Attaches stats listeners and the liveness-interval pre-ping to a (sync) engine.
+    For an AsyncEngine pass async_engine.sync_engine.
+    """
+    stats: PoolStats = engine.pool.stats
+    interval = settings.DB_POOL_PRE_PING_INTERVAL
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        stats.incr("connects")
+        connection_record.info["last_used"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        stats.incr("checkouts")
+        stats.observe_checked_out(engine.pool.checkedout())
+        if interval > 0:
+            idle = time.monotonic() - connection_record.info.get("last_used", 0.0)
+            if idle > interval:
+                # Only connections idle longer than the interval pay for a round trip
+                stats.incr("liveness_pings")
+                try:
+                    engine.dialect.do_ping(dbapi_connection)
+                except Exception as e:
+                    # The pool discards this connection and retries the checkout with a new one
+                    raise exc.DisconnectionError() from e
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        stats.incr("checkins")
+        connection_record.info["last_used"] = time.monotonic()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _on_statement(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        # Statements per request = delta / requests (see benchmarks.bench_suite)
+        stats.incr("statements")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection: Any, connection_record: Any, exception: Any) -> None:
+        stats.incr("invalidations")
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """Current gauges plus accumulated PoolStats for one engine's pool."""
+    pool = engine.pool
+    data: Dict[str, Any] = {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout_s": settings.DB_POOL_TIMEOUT,
+    }
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        data.update(stats.snapshot())
+    return data
@@ -0,0 +1,54 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class QueryStats:
+    """SQL statements of one request: how many, how long in total, and the slowest one."""
+    count: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+
+
+# Set per request by app.core.metrics.MetricsMiddleware. The object is shared, not copied, with the
+# threadpool (sync endpoints) and SQLAlchemy's greenlets (async engine), so their statements land here.
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def instrument_queries(engine: Engine) -> None:
+    """
+    Times every statement of a (sync) engine into the current request's QueryStats.
+    For an AsyncEngine pass async_engine.sync_engine. Outside a request nothing is recorded.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        if current_query_stats.get() is not None:
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        stats = current_query_stats.get()
+        starts = conn.info.get("query_start")
+        if stats is not None and starts:
+            stats.record(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context: Any) -> None:
+        # A failed statement never reaches after_cursor_execute
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
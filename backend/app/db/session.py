@@ -1,12 +1,21 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
+from app.db.pool import instrument_pool, pool_options
+from app.db.query_stats import instrument_queries
 
-# Create the SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+# Create the SQLAlchemy engine (pool sizing/recycling/pre-ping from Settings, see app.db.pool)
+engine = create_engine(settings.DATABASE_URL, **pool_options())
+instrument_pool(engine)
+instrument_queries(engine) # Per-request query count / DB time (Server-Timing, /metrics)
 
 # Create a configured "Session" class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: written objects keep their state after commit, so returning them needs no
+# refresh SELECT (primary keys come back through INSERT ... RETURNING, other defaults are set in Python)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
 
 # Dependency to get DB session
 def get_db():
@@ -14,4 +23,37 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+# --- Async engine (asyncio endpoints) ---
+# Sync driver -> asyncio driver for the same database
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url() -> str:
+    """ASYNC_DATABASE_URL if set, otherwise DATABASE_URL with its driver swapped (psycopg2 -> asyncpg)."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    async_driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if async_driver is None:
+        raise ValueError(f"No asyncio driver known for '{url.drivername}'. Set ASYNC_DATABASE_URL.")
+    return url.set(drivername=async_driver).render_as_string(hide_password=False)
+
+# Separate pool with the same limits: budget 2 x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections per worker
+async_engine = create_async_engine(get_async_database_url(), **pool_options(is_async=True))
+instrument_pool(async_engine.sync_engine)
+instrument_queries(async_engine.sync_engine)
+
+# expire_on_commit=False: objects stay readable after commit without lazy IO (not allowed in asyncio)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
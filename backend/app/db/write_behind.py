@@ -0,0 +1,382 @@
+"""
+Write-behind journal for the public form endpoints (WRITE_BEHIND_ENABLED).
+
+POST /reservations, /messages and /applications validate the submission, append it to a
+local SQLite database in WAL mode and answer 202 with a receipt. A background task in every
+worker claims batches from the journal and writes them to the main database with one
+multi-row INSERT per table, then deletes them from the journal.
+
+Crash recovery: rows stay in the journal until their INSERT has committed. Claims older than
+WRITE_BEHIND_CLAIM_TIMEOUT (a worker died mid-flush) are picked up again by any worker, and
+a restarted worker replays whatever is left. Delivery is therefore at-least-once: a crash
+between the commit and the journal delete writes that batch twice. Slot counters touched by a
+flush are recounted from the reservation table, so a replay cannot push them past the rows.
+Entries that can never be written (unreadable payload) are parked right away (dead = 1).
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, time as time_of_day
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+
+import anyio
+from sqlalchemy import exc, insert
+from sqlmodel import SQLModel, select
+
+from app.core.config import settings
+from app.crud.crud_reservation_slot import booked_guests_statement, set_guests_statement, slot_rows
+from app.db.session import async_engine
+from app.models.models import Application, BranchSetting, Message, Reservation
+from app.schemas.submission import SubmissionReceipt
+from app.utils.slots import slot_start
+
+logger = logging.getLogger(__name__)
+
+# Journal kind -> table model
+MODELS: Dict[str, Type[SQLModel]] = {
+    model.__tablename__: model for model in (Reservation, Application, Message)
+}
+MAX_ATTEMPTS = 5 # Rows rejected this often by the database are parked (dead = 1) for inspection
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submission (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    receipt TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    accepted_at REAL NOT NULL,
+    claimed_by TEXT,
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    dead INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_submission_dead_claimed_at_id ON submission (dead, claimed_at, id);
+"""
+
+
+class WriteBehindJournal:
+    """One SQLite connection per worker; its blocking calls run in the threadpool, serialized by a lock."""
+
+    def __init__(self, path: str, *, batch_size: int, flush_interval: float, claim_timeout: float) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.claim_timeout = claim_timeout
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        # Counters for the monitoring endpoint
+        self.accepted = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.last_flush_ms = 0.0
+
+    # --- Journal (SQLite) ---
+
+    def open(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # isolation_level=None: every statement commits on its own unless wrapped in BEGIN
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # FULL: the 202 is a promise, so the journal entry is fsynced before it is sent
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.executescript(SCHEMA)
+        self._conn = conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _append(self, kind: str, payload: str) -> Tuple[str, float]:
+        receipt, accepted_at = uuid.uuid4().hex, time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO submission (receipt, kind, payload, accepted_at) VALUES (?, ?, ?, ?)",
+                (receipt, kind, payload, accepted_at),
+            )
+            self.accepted += 1
+        return receipt, accepted_at
+
+    def _claim(self) -> Tuple[str, List[Tuple[int, str, str, int]]]:
+        """Marks the next batch as owned by a fresh claim id; stale claims of dead workers are taken over."""
+        claim_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    """
+                    UPDATE submission SET claimed_by = ?, claimed_at = ?
+                    WHERE id IN (
+                        SELECT id FROM submission
+                        WHERE dead = 0 AND (claimed_at IS NULL OR claimed_at < ?)
+                        ORDER BY id LIMIT ?
+                    )
+                    """,
+                    (claim_id, now, now - self.claim_timeout, self.batch_size),
+                )
+                rows = self._conn.execute(
+                    "SELECT id, kind, payload, attempts FROM submission WHERE claimed_by = ? ORDER BY id",
+                    (claim_id,),
+                ).fetchall()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return claim_id, rows
+
+    def _delete(self, ids: List[int]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM submission WHERE id = ?", [(id,) for id in ids])
+
+    def _release(self, ids: List[int], *, error: Optional[str] = None) -> None:
+        """Gives claimed rows back; with an error their attempt count grows until they are parked."""
+        with self._lock:
+            if error is None:
+                self._conn.executemany(
+                    "UPDATE submission SET claimed_by = NULL, claimed_at = NULL WHERE id = ?",
+                    [(id,) for id in ids],
+                )
+            else:
+                self._conn.executemany(
+                    """
+                    UPDATE submission
+                    SET claimed_by = NULL, claimed_at = NULL, attempts = attempts + 1, last_error = ?,
+                        dead = CASE WHEN attempts + 1 >= ? THEN 1 ELSE 0 END
+                    WHERE id = ?
+                    """,
+                    [(error, MAX_ATTEMPTS, id) for id in ids],
+                )
+
+    def _park(self, entries: List[Tuple[int, str]]) -> None:
+        """Parks rows that no retry can fix, with their error."""
+        with self._lock:
+            self._conn.executemany(
+                """
+                UPDATE submission
+                SET claimed_by = NULL, claimed_at = NULL, attempts = attempts + 1, last_error = ?, dead = 1
+                WHERE id = ?
+                """,
+                [(error, id) for id, error in entries],
+            )
+
+    def _counts(self) -> Tuple[int, int]:
+        with self._lock:
+            pending, dead = self._conn.execute(
+                "SELECT COALESCE(SUM(dead = 0), 0), COALESCE(SUM(dead = 1), 0) FROM submission"
+            ).fetchone()
+        return pending, dead
+
+    # --- Request side ---
+
+    async def enqueue(self, db_obj: SQLModel) -> SubmissionReceipt:
+        """Journals a validated, not yet persisted table model (see the CRUD build_* methods)."""
+        kind = db_obj.__tablename__
+        payload = json.dumps(db_obj.model_dump(mode="json", exclude={"id"}))
+        receipt, accepted_at = await anyio.to_thread.run_sync(self._append, kind, payload)
+        return SubmissionReceipt(receipt=receipt, kind=kind, accepted_at=datetime.utcfromtimestamp(accepted_at))
+
+    # --- Flusher ---
+
+    async def flush_once(self) -> int:
+        """
+        Writes one claimed batch to the database. Returns the number of rows taken off the pending
+        journal (written or parked).
+        """
+        claim_id, rows = await anyio.to_thread.run_sync(self._claim)
+        if not rows:
+            return 0
+        start = time.perf_counter()
+        by_model: Dict[Type[SQLModel], List[Tuple[int, Dict[str, Any]]]] = defaultdict(list)
+        unreadable: List[Tuple[int, str]] = []
+        for id, kind, payload, attempts in rows:
+            try:
+                model = MODELS[kind]
+                # Back through the table model: JSON strings -> dates, times, enums
+                values = model.model_validate(json.loads(payload)).model_dump(exclude={"id"})
+            except (KeyError, ValueError) as e: # ValueError covers bad JSON and pydantic's ValidationError
+                logger.error("Write-behind entry %s (%s) cannot be decoded, parking it: %s", id, kind, e)
+                unreadable.append((id, f"{type(e).__name__}: {e}"[:1000]))
+                continue
+            by_model[model].append((id, values))
+        if unreadable:
+            await anyio.to_thread.run_sync(self._park, unreadable)
+        ids = [id for entries in by_model.values() for id, _ in entries]
+        if not ids:
+            return len(unreadable)
+
+        try:
+            async with async_engine.begin() as conn:
+                for model, entries in by_model.items():
+                    await conn.execute(insert(model.__table__).values([values for _, values in entries]))
+                    await _count_slots(conn, model, [values for _, values in entries])
+        except (exc.IntegrityError, exc.DataError):
+            # A row the database refuses (e.g. its branch was deleted): find it, keep the rest flowing
+            self.failed_batches += 1
+            return await self._flush_row_by_row(by_model) + len(unreadable)
+        except Exception:
+            # Database unreachable or similar: nothing was written, retry the whole batch later
+            self.failed_batches += 1
+            await anyio.to_thread.run_sync(lambda: self._release(ids))
+            raise
+
+        await anyio.to_thread.run_sync(self._delete, ids)
+        self.batches += 1
+        self.flushed += len(ids)
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        return len(ids) + len(unreadable)
+
+    async def _flush_row_by_row(self, by_model: Dict[Type[SQLModel], List[Tuple[int, Dict[str, Any]]]]) -> int:
+        done: List[int] = []
+        for model, entries in by_model.items():
+            for id, values in entries:
+                try:
+                    async with async_engine.begin() as conn:
+                        await conn.execute(insert(model.__table__).values(**values))
+                        await _count_slots(conn, model, [values])
+                except (exc.IntegrityError, exc.DataError) as e:
+                    logger.error("Write-behind %s entry %s rejected by the database: %s", model.__tablename__, id, e.orig)
+                    await anyio.to_thread.run_sync(lambda: self._release([id], error=str(e.orig)[:1000]))
+                else:
+                    done.append(id)
+        if done:
+            await anyio.to_thread.run_sync(self._delete, done)
+            self.flushed += len(done)
+        return len(done)
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                flushed = await self.flush_once()
+            except Exception:
+                logger.exception("Write-behind flush failed; retrying in %.1fs", self.flush_interval)
+                flushed = 0
+            if flushed >= self.batch_size:
+                continue # Backlog: next batch right away
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        await anyio.to_thread.run_sync(self.open)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Stops the flusher after draining what it can; the rest stays journaled for the next start."""
+        self._stopping.set()
+        if self._task is not None:
+            await self._task
+        try:
+            with anyio.fail_after(drain_timeout):
+                while await self.flush_once():
+                    pass
+        except Exception:
+            logger.exception("Write-behind drain at shutdown incomplete; remaining entries stay journaled")
+        await anyio.to_thread.run_sync(self.close)
+
+    async def snapshot(self) -> Dict[str, Any]:
+        pending, dead = await anyio.to_thread.run_sync(self._counts)
+        return {
+            "pending": pending,
+            "dead": dead,
+            "accepted": self.accepted,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+        }
+
+
+_journal: Optional[WriteBehindJournal] = None
+
+
+async def _count_slots(conn: Any, model: Type[SQLModel], rows: List[Dict[str, Any]]) -> None:
+    """
+    Slot counters for flushed reservations of branches that got a capacity after they were journaled
+    (capacity-limited branches book synchronously), in the flush transaction. The touched slots are
+    recounted from the reservation table rather than incremented, so replaying a batch that already
+    committed (at-least-once delivery) leaves them matching the rows. Capacity and slot grid come
+    from branchsetting in the same transaction, not from the (possibly stale) branch registry.
+    The branch rows are locked FOR NO KEY UPDATE first, as CRUDReservationSlot.rebuild does: a
+    booking holds its branch FOR SHARE until it commits, so the recount waits for in-flight bookings
+    and new ones wait for the flush, and no booking's increment is overwritten with a stale total.
+    Used by both the batch and the row-by-row flush.
+    """
+    if model is not Reservation:
+        return
+    branch_ids = {values["branch_id"] for values in rows if values.get("branch_id")}
+    if not branch_ids:
+        return
+    branches = {
+        branch.id: branch
+        for branch in (await conn.execute(
+            select(
+                BranchSetting.id, BranchSetting.reservation_opens_at, BranchSetting.reservation_slot_minutes,
+            )
+            .where(BranchSetting.id.in_(branch_ids), BranchSetting.reservation_capacity.is_not(None))
+            .order_by(BranchSetting.id) # Same lock order in every worker
+            .with_for_update(key_share=True) # Like rebuild: excludes bookings (FOR SHARE) until the recount commits
+        )).all()
+    }
+    touched: Dict[Tuple[int, date], Set[time_of_day]] = defaultdict(set)
+    for values in rows:
+        branch = branches.get(values.get("branch_id"))
+        if branch is not None:
+            touched[(branch.id, values["reservation_date"])].add(slot_start(
+                values["reservation_time"],
+                opens_at=branch.reservation_opens_at, slot_minutes=branch.reservation_slot_minutes,
+            ))
+    for (branch_id, reservation_date), slots in touched.items():
+        branch = branches[branch_id]
+        booked = (await conn.execute(
+            booked_guests_statement(branch_id).where(Reservation.reservation_date == reservation_date)
+        )).all()
+        totals = {
+            row["slot_time"]: row["booked_guests"]
+            for row in slot_rows(
+                branch_id=branch_id, opens_at=branch.reservation_opens_at,
+                slot_minutes=branch.reservation_slot_minutes, booked=booked,
+            )
+        }
+        await conn.execute(set_guests_statement(conn.dialect.name, [
+            {"branch_id": branch_id, "slot_date": reservation_date, "slot_time": slot, "booked_guests": totals.get(slot, 0)}
+            for slot in sorted(slots)
+        ]))
+
+
+def get_write_behind() -> Optional[WriteBehindJournal]:
+    """The running journal, or None when submissions are written synchronously."""
+    return _journal
+
+
+async def start_write_behind() -> None:
+    global _journal
+    if not settings.WRITE_BEHIND_ENABLED:
+        return
+    journal = WriteBehindJournal(
+        settings.WRITE_BEHIND_JOURNAL_PATH,
+        batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+        flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL,
+        claim_timeout=settings.WRITE_BEHIND_CLAIM_TIMEOUT,
+    )
+    await journal.start()
+    _journal = journal
+
+
+async def stop_write_behind() -> None:
+    global _journal
+    if _journal is not None:
+        journal, _journal = _journal, None
+        await journal.stop()
@@ -1,15 +1,46 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, metrics_endpoint, start_metrics, stop_metrics
+from app.core.security import PasswordHashingBusy, shutdown_password_hashing, start_password_hashing
+from app.db.branch_events import start_branch_events, stop_branch_events
+from app.db.write_behind import start_write_behind, stop_write_behind
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_metrics()
+    await run_in_threadpool(start_password_hashing)
+    await start_branch_events()
+    await start_write_behind() # Also replays what a previous run left in the journal
+    yield
+    await stop_write_behind()
+    await stop_branch_events()
+    await run_in_threadpool(shutdown_password_hashing)
+    await stop_metrics()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
     # Add other FastAPI app settings if needed
 )
 
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy) -> JSONResponse:
+    # Backpressure from the bcrypt pool: ask the client to retry instead of queueing without bound
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many concurrent sign-ins, please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
+
 # CORS
 if settings.BACKEND_CORS_ORIGINS:
     origins = [
@@ -23,10 +54,17 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "Server-Timing"], # Keyset pagination cursor; per-request DB timing
     )
 
+# Outermost, so Server-Timing and the metrics cover every other middleware too
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+if settings.METRICS_ENABLED:
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
 @app.get("/")
 def read_root():
     return {"message": f"Welcome to {settings.PROJECT_NAME}"} 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from .models import User, BranchSetting, ManagedTable, Reservation, Application, Message
+from .models import User, BranchSetting, ManagedTable, Reservation, ReservationSlot, Application, Message
 
 # You might need to import SQLModel itself if you define a Base model later
 # from sqlmodel import SQLModel 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlmodel import SQLModel, Field, Relationship, JSON, Column
+from sqlmodel import SQLModel, Field, Relationship, JSON, Column, Index, UniqueConstraint
 from typing import List, Optional, Dict, Any
 from datetime import date, time, datetime
 import enum
@@ -11,6 +11,12 @@ class BranchSetting(SQLModel, table=True):
     display_whatsapp_number: Optional[str] = Field(default=None)
     default_links: Dict[str, Any] = Field(sa_column=Column(JSON))
     link_order: List[str] = Field(sa_column=Column(JSON))
+    # Reservation capacity: guests per slot; None = reservations are neither limited nor counted
+    reservation_capacity: Optional[int] = Field(default=None)
+    # Server defaults as in the migration, for rows inserted without the ORM (e.g. benchmarks.seed)
+    reservation_slot_minutes: int = Field(default=30, sa_column_kwargs={"server_default": "30"})
+    reservation_opens_at: time = Field(default=time(12, 0), sa_column_kwargs={"server_default": "12:00:00"}) # First slot
+    reservation_last_slot_at: time = Field(default=time(22, 0), sa_column_kwargs={"server_default": "22:00:00"})
 
     users: List["User"] = Relationship(back_populates="branch")
     managed_tables: List["ManagedTable"] = Relationship(back_populates="branch")
@@ -36,8 +42,8 @@ class ManagedTable(SQLModel, table=True):
     branch_id: int = Field(foreign_key="branchsetting.id")
     branch: BranchSetting = Relationship(back_populates="managed_tables")
 
-    # Add unique constraint for table_number within a branch?
-    # __table_args__ = (UniqueConstraint("table_number", "branch_id", name="_table_branch_uc"),)
+    # One table number per branch; its index also serves the public QR lookup on (branch_id, table_number)
+    __table_args__ = (UniqueConstraint("branch_id", "table_number", name="uq_managedtable_branch_id_table_number"),)
 
 class ReservationStatus(str, enum.Enum):
     PENDING = "pending"
@@ -45,6 +51,11 @@ class ReservationStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 class Reservation(SQLModel, table=True):
+    # Keyset pagination (newest first): per branch and across branches for superusers
+    __table_args__ = (
+        Index("ix_reservation_branch_id_received_at_id", "branch_id", "received_at", "id"),
+        Index("ix_reservation_received_at_id", "received_at", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     email: str = Field(index=True)
@@ -52,19 +63,36 @@ class Reservation(SQLModel, table=True):
     reservation_date: date
     reservation_time: time
     guest_count: int
-    branch_key: str # Needs mapping to BranchSetting.slug
+    branch_key: str # Slug as submitted; kept for display, filtering goes through branch_id
+    branch_id: Optional[int] = Field(default=None, foreign_key="branchsetting.id")
     message: Optional[str] = Field(default=None)
     consent: bool
     status: ReservationStatus = Field(default=ReservationStatus.PENDING)
     received_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
 
+class ReservationSlot(SQLModel, table=True):
+    """
+    Guests booked per branch, date and slot (cancelled reservations excluded), for branches with a
+    reservation capacity. Written in the transaction of every reservation change (crud_reservation_slot),
+    so availability is one primary key range read instead of an aggregate over reservation.
+    """
+    branch_id: int = Field(foreign_key="branchsetting.id", primary_key=True)
+    slot_date: date = Field(primary_key=True)
+    slot_time: time = Field(primary_key=True)
+    booked_guests: int = Field(default=0)
+
 class Application(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_application_branch_id_submitted_at_id", "branch_id", "submitted_at", "id"),
+        Index("ix_application_submitted_at_id", "submitted_at", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     email: str = Field(index=True)
     phone: str
     birthdate: date
-    branch_key: str # Needs mapping to BranchSetting.slug
+    branch_key: str # Slug as submitted; kept for display, filtering goes through branch_id
+    branch_id: Optional[int] = Field(default=None, foreign_key="branchsetting.id")
     department: str
     experience_years: int
     message: Optional[str] = Field(default=None)
@@ -73,6 +101,10 @@ class Application(SQLModel, table=True):
     submitted_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
 
 class Message(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_message_branch_id_received_at_id", "branch_id", "received_at", "id"),
+        Index("ix_message_received_at_id", "received_at", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     email: str = Field(index=True)
@@ -80,4 +112,5 @@ class Message(SQLModel, table=True):
     subject: Optional[str] = Field(default=None)
     message: str
     branch_key: str = Field(index=True)
+    branch_id: Optional[int] = Field(default=None, foreign_key="branchsetting.id") # None if branch_key matched no branch
     received_at: datetime = Field(default_factory=datetime.utcnow, nullable=False) 
\ No newline at end of file
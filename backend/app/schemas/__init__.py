@@ -1,11 +1,12 @@
 from .auth import Token, TokenPayload, RefreshToken
-from .user import UserBase, UserCreate, UserRead, UserUpdate, UserInDB
+from .user import UserBase, UserCreate, UserRead, UserUpdate, UserInDB, UserPrincipal
 from .branch import BranchSettingBase, BranchSettingCreate, BranchSettingRead, BranchSettingUpdate, BranchSettingInDB
 from .table import ManagedTableBase, ManagedTableCreate, ManagedTableRead, ManagedTableUpdate, ManagedTableBulkCreate, ManagedTableBulkDelete, ManagedTableInDB
-from .reservation import ReservationBase, ReservationCreate, ReservationRead, ReservationUpdate, ReservationInDB
+from .reservation import ReservationBase, ReservationCreate, ReservationRead, ReservationUpdate, ReservationInDB, SlotAvailability, ReservationAvailability
 from .application import ApplicationBase, ApplicationCreate, ApplicationRead, ApplicationInDB
 from .message import MessageBase, MessageCreate, MessageRead, MessageInDB
 from .view import LinkItem, TableCustomerViewData
+from .submission import SubmissionReceipt
 
 # Import other schemas as they are created
 # from .branch import BranchSettingBase, BranchSettingCreate, BranchSettingRead, BranchSettingUpdate
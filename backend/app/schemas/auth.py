@@ -10,7 +10,8 @@ class Token(BaseModel):
 # Schema for the data stored within the JWT access token
 class TokenPayload(BaseModel):
     sub: Optional[str] = None # Subject (usually user ID or email)
-    # Add other claims as needed (e.g., exp, iat, roles)
+    exp: Optional[int] = None # Expiry (Unix timestamp)
+    type: Optional[str] = None # "refresh" for refresh tokens, unset for access tokens
 
 # Schema for receiving refresh token
 class RefreshToken(BaseModel):
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
+from datetime import time
 
 # Shared properties
 class BranchSettingBase(BaseModel):
@@ -8,6 +9,11 @@ class BranchSettingBase(BaseModel):
     display_whatsapp_number: Optional[str] = Field(default=None, example="+905551234567")
     default_links: Dict[str, Any] = Field(..., example={"order": "https://example.com/order", "feedback": "https://example.com/feedback"})
     link_order: List[str] = Field(..., example=["order", "feedback"])
+    # Reservation capacity per slot (guests); None = reservations are not limited
+    reservation_capacity: Optional[int] = Field(default=None, example=40, ge=1)
+    reservation_slot_minutes: int = Field(default=30, example=30, ge=5, le=240)
+    reservation_opens_at: time = Field(default=time(12, 0), example="12:00:00")
+    reservation_last_slot_at: time = Field(default=time(22, 0), example="22:00:00")
 
 # Properties to receive via API on creation
 class BranchSettingCreate(BranchSettingBase):
@@ -20,6 +26,10 @@ class BranchSettingUpdate(BaseModel):
     display_whatsapp_number: Optional[str] = None
     default_links: Optional[Dict[str, Any]] = None
     link_order: Optional[List[str]] = None
+    reservation_capacity: Optional[int] = Field(default=None, ge=1) # Send null to lift the limit
+    reservation_slot_minutes: Optional[int] = Field(default=None, ge=5, le=240)
+    reservation_opens_at: Optional[time] = None
+    reservation_last_slot_at: Optional[time] = None
 
 # Properties shared by models stored in DB
 class BranchSettingInDBBase(BranchSettingBase):
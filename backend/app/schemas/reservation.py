@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import date, time, datetime
 from app.models.models import ReservationStatus # Import Enum from models
 
@@ -38,4 +38,17 @@ class ReservationRead(ReservationInDBBase):
 
 # Properties stored in DB
 class ReservationInDB(ReservationInDBBase):
-    pass 
\ No newline at end of file
+    pass
+
+# Public availability of one branch and date (answered from the slot counters, see crud_reservation_slot)
+class SlotAvailability(BaseModel):
+    reservation_time: time = Field(..., example="19:30:00") # Slot start
+    remaining_guests: Optional[int] = Field(default=None, example=12) # None = not limited
+    available: bool # Room for the requested guest count
+
+class ReservationAvailability(BaseModel):
+    branch_key: str
+    reservation_date: date
+    guest_count: int
+    capacity: Optional[int] = Field(default=None, example=40) # Guests per slot, None = not limited
+    slots: List[SlotAvailability]
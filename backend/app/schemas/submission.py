@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+# Returned with 202 when a public submission was journaled for a later database write (write-behind mode)
+class SubmissionReceipt(BaseModel):
+    receipt: str = Field(..., example="3f2b9c0e5d8a4b7e9f1a2c3d4e5f6a7b")
+    kind: str = Field(..., example="reservation") # reservation, application or message
+    accepted_at: datetime
@@ -14,11 +14,20 @@ class ManagedTableCreate(ManagedTableBase):
     link: Optional[str] = None # Link will be generated by the backend
 
 # Properties to receive via API for bulk creation
+# Either a contiguous range (start_number..end_number) or an explicit table_numbers list
 class ManagedTableBulkCreate(BaseModel):
-    start_number: int = Field(..., example=1)
-    end_number: int = Field(..., example=20)
+    start_number: Optional[int] = Field(default=None, example=1)
+    end_number: Optional[int] = Field(default=None, example=20)
+    table_numbers: Optional[List[int]] = Field(default=None, example=[1, 2, 5, 101])
     # branch_id will be derived from the authenticated user
 
+    def requested_numbers(self) -> List[int]:
+        """Sorted, de-duplicated table numbers from the list and/or the range."""
+        numbers = set(self.table_numbers or [])
+        if self.start_number is not None and self.end_number is not None:
+            numbers.update(range(self.start_number, self.end_number + 1))
+        return sorted(numbers)
+
 # Properties to receive via API for bulk deletion
 class ManagedTableBulkDelete(BaseModel):
     table_ids: List[int] = Field(..., example=[1, 3, 5])
@@ -37,4 +37,14 @@ class UserRead(UserInDBBase):
 
 # Properties stored in DB
 class UserInDB(UserInDBBase):
-    hashed_password: str 
\ No newline at end of file
+    hashed_password: str
+
+# Authenticated user as seen by the API dependencies (cached, see app.core.cache)
+class UserPrincipal(BaseModel):
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    is_superuser: bool
+    branch_id: Optional[int] = None
+    branch_slug: Optional[str] = None 
\ No newline at end of file
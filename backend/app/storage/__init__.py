@@ -0,0 +1,27 @@
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import settings
+
+from .base import CHUNK_SIZE, Storage, StorageWriter, StoredObject
+from .local import LocalStorage
+
+
+@lru_cache
+def get_cv_storage() -> Storage:
+    """The CV storage backend selected by CV_STORAGE_BACKEND (one instance per process)."""
+    if settings.CV_STORAGE_BACKEND == "local":
+        return LocalStorage(Path(settings.CV_STORAGE_LOCAL_DIR))
+    if settings.CV_STORAGE_BACKEND == "s3":
+        from .s3 import S3Storage # boto3 is only imported when S3 is configured
+        if not settings.S3_BUCKET:
+            raise ValueError("CV_STORAGE_BACKEND='s3' requires S3_BUCKET.")
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        )
+    raise ValueError(f"Unknown CV_STORAGE_BACKEND '{settings.CV_STORAGE_BACKEND}'. Use 'local' or 's3'.")
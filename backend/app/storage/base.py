@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Optional
+
+# Read size used when streaming stored objects back to clients
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    last_modified: datetime
+    content_type: Optional[str] = None
+    etag: Optional[str] = None # Backend's own version tag (S3 ETag), if any
+
+
+class StorageWriter(ABC):
+    """Streaming upload of one object. Nothing is visible under the key before commit()."""
+
+    @abstractmethod
+    async def write(self, chunk: bytes) -> None: ...
+
+    @abstractmethod
+    async def commit(self) -> StoredObject: ...
+
+    @abstractmethod
+    async def abort(self) -> None: ...
+
+
+class Storage(ABC):
+    """Object storage for uploaded files (CVs). Keys are flat, backend-independent names."""
+
+    @abstractmethod
+    async def open_writer(self, key: str, *, content_type: Optional[str] = None) -> StorageWriter: ...
+
+    async def put(
+        self, key: str, chunks: AsyncIterable[bytes], *, content_type: Optional[str] = None
+    ) -> StoredObject:
+        writer = await self.open_writer(key, content_type=content_type)
+        try:
+            async for chunk in chunks:
+                await writer.write(chunk)
+        except BaseException:
+            await writer.abort()
+            raise
+        return await writer.commit()
+
+    @abstractmethod
+    def stream_get(self, key: str, *, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Yields the bytes of key from start to end (inclusive), or to the end of the object."""
+
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        """Size and modification time of key, or None if it does not exist."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Removes key; missing keys are ignored."""
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path of key if the backend stores it locally (lets the server use sendfile)."""
+        return None
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import secrets
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import anyio
+
+from app.storage.base import CHUNK_SIZE, Storage, StorageWriter, StoredObject
+
+
+class LocalStorageWriter(StorageWriter):
+    def __init__(self, storage: "LocalStorage", key: str, content_type: Optional[str]) -> None:
+        self.storage = storage
+        self.key = key
+        self.content_type = content_type
+        self.path = storage.path_for(key)
+        # Written next to the final path and renamed on commit: readers never see a partial file
+        self.part_path = self.path.with_name(f".{self.path.name}.{secrets.token_hex(4)}.part")
+        self._file = None
+
+    async def _ensure_open(self) -> None:
+        if self._file is None:
+            await anyio.Path(self.part_path.parent).mkdir(parents=True, exist_ok=True)
+            self._file = await anyio.open_file(self.part_path, "wb")
+
+    async def write(self, chunk: bytes) -> None:
+        await self._ensure_open()
+        await self._file.write(chunk)
+
+    async def commit(self) -> StoredObject:
+        await self._ensure_open()
+        await self._file.aclose()
+        await anyio.to_thread.run_sync(os.replace, self.part_path, self.path)
+        return await self.storage.stat(self.key)
+
+    async def abort(self) -> None:
+        if self._file is not None:
+            await self._file.aclose()
+        await anyio.Path(self.part_path).unlink(missing_ok=True)
+
+
+class LocalStorage(Storage):
+    """
+    Files under `root`, sharded two levels deep by a hash of the key (root/ab/cd/<key>)
+    so no directory grows past a few thousand entries.
+    Absolute paths stored before keys existed are still served if they lie inside root.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root).resolve()
+
+    def path_for(self, key: str) -> Path:
+        candidate = Path(key)
+        if candidate.is_absolute():
+            # Legacy rows store the full path of an unsharded file
+            path = candidate.resolve()
+            if not path.is_relative_to(self.root):
+                raise ValueError("Path outside the storage root")
+            return path
+        if not key or "/" in key or "\\" in key or key.startswith("."):
+            raise ValueError(f"Invalid storage key '{key}'")
+        digest = hashlib.blake2b(key.encode(), digest_size=2).hexdigest()
+        return self.root / digest[:2] / digest[2:4] / key
+
+    async def open_writer(self, key: str, *, content_type: Optional[str] = None) -> StorageWriter:
+        return LocalStorageWriter(self, key, content_type)
+
+    async def stream_get(self, key: str, *, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        remaining = None if end is None else end - start + 1
+        async with await anyio.open_file(self.path_for(key), "rb") as fh:
+            if start:
+                await fh.seek(start)
+            while remaining is None or remaining > 0:
+                chunk = await fh.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            st = await anyio.Path(self.path_for(key)).stat()
+        except (FileNotFoundError, ValueError):
+            return None
+        return StoredObject(
+            key=key,
+            size=st.st_size,
+            last_modified=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+        )
+
+    async def delete(self, key: str) -> None:
+        await anyio.Path(self.path_for(key)).unlink(missing_ok=True)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self.path_for(key)
@@ -0,0 +1,153 @@
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import anyio
+
+from app.storage.base import CHUNK_SIZE, Storage, StorageWriter, StoredObject
+
+try:
+    import boto3
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+except ImportError: # Optional dependency, only needed for CV_STORAGE_BACKEND="s3"
+    boto3 = None
+
+# S3 multipart uploads need parts of at least 5 MiB (except the last one)
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+
+
+class S3StorageWriter(StorageWriter):
+    """
+    Buffers up to one part in memory. Objects smaller than a part (every CV) go up with a single
+    PutObject on commit; larger ones switch to a multipart upload as the buffer fills.
+    """
+
+    def __init__(self, storage: "S3Storage", key: str, content_type: Optional[str]) -> None:
+        self.storage = storage
+        self.key = key
+        self.content_type = content_type
+        self.buffer = bytearray()
+        self.upload_id: Optional[str] = None
+        self.parts: List[Dict[str, Any]] = []
+
+    def _extra_args(self) -> Dict[str, Any]:
+        return {"ContentType": self.content_type} if self.content_type else {}
+
+    async def _upload_part(self) -> None:
+        s3 = self.storage
+        if self.upload_id is None:
+            response = await s3.call(
+                s3.client.create_multipart_upload, Bucket=s3.bucket, Key=s3.object_key(self.key), **self._extra_args()
+            )
+            self.upload_id = response["UploadId"]
+        part_number = len(self.parts) + 1
+        response = await s3.call(
+            s3.client.upload_part,
+            Bucket=s3.bucket, Key=s3.object_key(self.key), UploadId=self.upload_id,
+            PartNumber=part_number, Body=bytes(self.buffer),
+        )
+        self.parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+        self.buffer.clear()
+
+    async def write(self, chunk: bytes) -> None:
+        self.buffer += chunk
+        if len(self.buffer) >= MULTIPART_PART_SIZE:
+            await self._upload_part()
+
+    async def commit(self) -> StoredObject:
+        s3 = self.storage
+        if self.upload_id is None:
+            await s3.call(
+                s3.client.put_object,
+                Bucket=s3.bucket, Key=s3.object_key(self.key), Body=bytes(self.buffer), **self._extra_args(),
+            )
+        else:
+            if self.buffer:
+                await self._upload_part()
+            await s3.call(
+                s3.client.complete_multipart_upload,
+                Bucket=s3.bucket, Key=s3.object_key(self.key), UploadId=self.upload_id,
+                MultipartUpload={"Parts": self.parts},
+            )
+        return await s3.stat(self.key)
+
+    async def abort(self) -> None:
+        self.buffer.clear()
+        if self.upload_id is not None:
+            s3 = self.storage
+            await s3.call(
+                s3.client.abort_multipart_upload,
+                Bucket=s3.bucket, Key=s3.object_key(self.key), UploadId=self.upload_id,
+            )
+
+
+class S3Storage(Storage):
+    """S3-compatible object storage (AWS S3, MinIO, ...). boto3 calls run in worker threads."""
+
+    def __init__(
+        self,
+        *,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region_name: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+    ) -> None:
+        if boto3 is None:
+            raise ImportError("CV_STORAGE_BACKEND='s3' requires the boto3 package (pip install boto3).")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region_name,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            # Path-style addressing works with MinIO and other S3-compatible servers
+            config=BotoConfig(s3={"addressing_style": "path"}),
+        )
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    async def call(self, func: Any, **kwargs: Any) -> Any:
+        return await anyio.to_thread.run_sync(partial(func, **kwargs))
+
+    async def open_writer(self, key: str, *, content_type: Optional[str] = None) -> StorageWriter:
+        return S3StorageWriter(self, key, content_type)
+
+    async def stream_get(self, key: str, *, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        kwargs: Dict[str, Any] = {"Bucket": self.bucket, "Key": self.object_key(key)}
+        if start or end is not None:
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end}"
+        response = await self.call(self.client.get_object, **kwargs)
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await anyio.to_thread.run_sync(body.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            response = await self.call(self.client.head_object, Bucket=self.bucket, Key=self.object_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        last_modified: datetime = response["LastModified"]
+        return StoredObject(
+            key=key,
+            size=response["ContentLength"],
+            last_modified=last_modified if last_modified.tzinfo else last_modified.replace(tzinfo=timezone.utc),
+            content_type=response.get("ContentType"),
+            etag=response.get("ETag"),
+        )
+
+    async def delete(self, key: str) -> None:
+        await self.call(self.client.delete_object, Bucket=self.bucket, Key=self.object_key(key))
@@ -0,0 +1,104 @@
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Mapping, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+
+def make_etag(content: bytes) -> str:
+    """Strong ETag derived from the response body."""
+    return '"' + hashlib.blake2b(content, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def http_date(value: datetime) -> str:
+    """IMF-fixdate (RFC 9110 5.6.7) for Last-Modified and friends."""
+    return formatdate(value.timestamp(), usegmt=True)
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, last_modified: datetime) -> bool:
+    """
+    Whether a GET can be answered with 304 (RFC 9110 13.2.2): If-None-Match wins when present,
+    otherwise If-Modified-Since is compared at one-second resolution.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return int(last_modified.timestamp()) <= int(since.timestamp())
+    return False
+
+
+def parse_byte_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Single byte range of a Range header as inclusive (start, end) within size.
+    Returns None for headers to ignore (not bytes, malformed, several ranges: serve the whole body)
+    and raises ValueError when the range cannot be satisfied (416).
+    """
+    units, _, spec = range_header.partition("=")
+    if units.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        elif last:
+            # Suffix range: the last N bytes
+            start, end = max(0, size - int(last)), size - 1
+        else:
+            return None
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+
+class PathSendFileResponse(FileResponse):
+    """
+    FileResponse that hands whole-file bodies to the server through the ASGI "http.response.pathsend"
+    extension when offered (e.g. Granian), so the server can sendfile() without copying through Python.
+    Range requests and servers without the extension (uvicorn) use FileResponse's chunked reads.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            "http.response.pathsend" not in scope.get("extensions", {})
+            or scope["method"].upper() == "HEAD"
+            or Headers(scope=scope).get("range")
+        ):
+            return await super().__call__(scope, receive, send)
+        if self.stat_result is None:
+            self.set_stat_headers(await anyio.to_thread.run_sync(os.stat, self.path))
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": "http.response.pathsend", "path": str(self.path)})
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,13 @@
+from app.core.config import settings
+
+
+def table_link_prefix(branch_slug: str) -> str:
+    """Everything of a table's default QR link before the table number."""
+    # Ensure BASE_URL is the frontend URL (e.g., https://positive-tranquility-production.up.railway.app)
+    base_url = settings.BASE_URL.rstrip('/')
+    return f"{base_url}/musteri/sube/{branch_slug}/table/"
+
+
+def build_table_link(branch_slug: str, table_number: int) -> str:
+    """Default QR code link for a table (frontend route /musteri/sube/:branch_slug/table/:table_number)."""
+    return f"{table_link_prefix(branch_slug)}{table_number}"
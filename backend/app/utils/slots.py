@@ -0,0 +1,28 @@
+from datetime import time
+from typing import List
+
+
+def _minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def slot_start(value: time, *, opens_at: time, slot_minutes: int) -> time:
+    """Start of the reservation slot a time falls in; slots are counted from opens_at."""
+    offset = (_minutes(value) - _minutes(opens_at)) // slot_minutes * slot_minutes
+    minutes = (_minutes(opens_at) + offset) % (24 * 60)
+    return time(minutes // 60, minutes % 60)
+
+
+def slot_times(*, opens_at: time, last_slot_at: time, slot_minutes: int) -> List[time]:
+    """Every slot start from opens_at up to and including last_slot_at."""
+    return [
+        time(minutes // 60, minutes % 60)
+        for minutes in range(_minutes(opens_at), _minutes(last_slot_at) + 1, slot_minutes)
+    ]
+
+
+def in_slot_grid(value: time, *, opens_at: time, last_slot_at: time, slot_minutes: int) -> bool:
+    """Whether a time falls in one of the slots of slot_times (opens_at up to the end of the last slot)."""
+    if _minutes(value) < _minutes(opens_at):
+        return False
+    return _minutes(slot_start(value, opens_at=opens_at, slot_minutes=slot_minutes)) <= _minutes(last_slot_at)
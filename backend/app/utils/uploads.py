@@ -0,0 +1,184 @@
+import re
+import secrets
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, Request
+
+from app.storage import Storage, StorageWriter
+
+try:
+    import python_multipart as multipart
+    from python_multipart.exceptions import MultipartParseError
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError: # python-multipart < 0.0.13
+    import multipart
+    from multipart.exceptions import MultipartParseError
+    from multipart.multipart import parse_options_header
+
+# (leading bytes, stored extension, media type) of the accepted CV formats
+CV_SIGNATURES: Tuple[Tuple[bytes, str, str], ...] = (
+    (b"%PDF-", ".pdf", "application/pdf"),
+    (b"PK\x03\x04", ".docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", ".doc", "application/msword"), # OLE2 compound file
+)
+SIGNATURE_LENGTH = max(len(signature) for signature, _, _ in CV_SIGNATURES)
+
+MAX_FIELD_SIZE = 64 * 1024 # Per text field
+MAX_FIELDS = 32
+FORM_OVERHEAD = MAX_FIELDS * 1024 # Boundaries and part headers allowed on top of the file
+
+
+def detect_cv_type(head: bytes) -> Optional[Tuple[str, str]]:
+    """(extension, media type) for the first bytes of a CV, or None if it is not PDF/DOCX/DOC."""
+    for signature, extension, media_type in CV_SIGNATURES:
+        if head.startswith(signature):
+            return extension, media_type
+    return None
+
+
+@dataclass
+class StreamedUpload:
+    fields: Dict[str, str] = field(default_factory=dict)
+    file_key: Optional[str] = None # Storage key of the committed file
+    file_size: int = 0
+    media_type: Optional[str] = None
+
+
+class _FileSink:
+    """Receives one file part: sniffs the type from the first bytes, then streams it into storage."""
+
+    def __init__(self, storage: Storage, name_prefix: str, max_size: int) -> None:
+        self.storage = storage
+        self.name_prefix = name_prefix
+        self.max_size = max_size
+        self.head = b""
+        self.size = 0
+        self.key: Optional[str] = None
+        self.media_type: Optional[str] = None
+        self._writer: Optional[StorageWriter] = None
+
+    async def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise HTTPException(status_code=413, detail=f"File size exceeds the limit of {self.max_size // (1024 * 1024)}MB.")
+        if self._writer is None:
+            self.head += chunk
+            if len(self.head) < SIGNATURE_LENGTH:
+                return
+            await self._open()
+            chunk, self.head = self.head, b""
+        await self._writer.write(chunk)
+
+    async def _open(self) -> None:
+        detected = detect_cv_type(self.head)
+        if detected is None:
+            raise HTTPException(status_code=400, detail="Invalid file type. Only PDF and Word documents are allowed.")
+        extension, self.media_type = detected
+        self.key = f"{self.name_prefix}{secrets.token_hex(8)}{extension}"
+        self._writer = await self.storage.open_writer(self.key, content_type=self.media_type)
+
+    async def finish(self) -> None:
+        if self._writer is None:
+            # Files shorter than the longest signature
+            await self._open()
+            await self._writer.write(self.head)
+        await self._writer.commit()
+        self._writer = None
+
+    async def discard(self) -> None:
+        if self._writer is not None:
+            await self._writer.abort()
+        elif self.key is not None:
+            # Already committed
+            await self.storage.delete(self.key)
+
+
+async def stream_cv_upload(
+    request: Request, *, file_field: str, storage: Storage, max_file_size: int
+) -> StreamedUpload:
+    """
+    Parses a multipart/form-data body straight off the socket.
+    Text fields are collected in memory (bounded); the file part is type-checked from its magic
+    bytes and streamed chunk by chunk into `storage` under a fresh key.
+    Nothing is spooled to a temporary file, and the upload is aborted as soon as it exceeds
+    max_file_size. On any error the partial file is removed and an HTTPException is raised.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body.")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_file_size + FORM_OVERHEAD:
+        raise HTTPException(status_code=413, detail=f"File size exceeds the limit of {max_file_size // (1024 * 1024)}MB.")
+
+    # The parser is push-based and synchronous: its callbacks queue events, handled after each chunk
+    events: List[Tuple[str, bytes]] = []
+    parser = multipart.MultipartParser(params[b"boundary"], callbacks={
+        "on_part_begin": lambda: events.append(("part_begin", b"")),
+        "on_header_field": lambda data, start, end: events.append(("header_field", data[start:end])),
+        "on_header_value": lambda data, start, end: events.append(("header_value", data[start:end])),
+        "on_header_end": lambda: events.append(("header_end", b"")),
+        "on_part_data": lambda data, start, end: events.append(("part_data", data[start:end])),
+        "on_part_end": lambda: events.append(("part_end", b"")),
+    })
+
+    result = StreamedUpload()
+    header_field = b""
+    header_value = b""
+    part_name: Optional[str] = None
+    part_value = bytearray()
+    sink: Optional[_FileSink] = None
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except MultipartParseError:
+                raise HTTPException(status_code=400, detail="Malformed multipart body.")
+            for event, data in events:
+                if event == "part_begin":
+                    header_field, header_value, part_name = b"", b"", None
+                    part_value = bytearray()
+                elif event == "header_field":
+                    header_field += data
+                elif event == "header_value":
+                    header_value += data
+                elif event == "header_end":
+                    if header_field.lower() == b"content-disposition":
+                        _, options = parse_options_header(header_value)
+                        part_name = options.get(b"name", b"").decode("latin-1")
+                        if part_name == file_field:
+                            if sink is not None:
+                                raise HTTPException(status_code=400, detail="Only one CV file is allowed.")
+                            email = result.fields.get("email", "")
+                            # Unvalidated at this point: keep only filename-safe characters
+                            prefix = re.sub(r"[^A-Za-z0-9_-]", "_", email)[:64] + "_" if email else ""
+                            sink = _FileSink(storage, prefix, max_file_size)
+                    header_field, header_value = b"", b""
+                elif event == "part_data":
+                    if part_name == file_field:
+                        await sink.write(data)
+                    else:
+                        part_value += data
+                        if len(part_value) > MAX_FIELD_SIZE:
+                            raise HTTPException(status_code=413, detail="Form field too large.")
+                elif event == "part_end":
+                    if part_name == file_field:
+                        await sink.finish()
+                        result.file_key, result.file_size, result.media_type = sink.key, sink.size, sink.media_type
+                    elif part_name:
+                        if len(result.fields) >= MAX_FIELDS:
+                            raise HTTPException(status_code=413, detail="Too many form fields.")
+                        result.fields[part_name] = part_value.decode("utf-8", errors="replace")
+                    part_name = None
+            events.clear()
+        parser.finalize()
+        if sink is not None and result.file_key is None:
+            raise HTTPException(status_code=400, detail="Incomplete multipart body.")
+    except BaseException:
+        # Client disconnects and cancellation included: never leave a partial CV behind
+        if sink is not None:
+            with anyio.CancelScope(shield=True):
+                await sink.discard()
+        raise
+    return result
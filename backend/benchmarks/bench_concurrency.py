@@ -0,0 +1,82 @@
+"""
+Per-worker concurrency benchmark for the public endpoints.
+
+Start a single worker so the numbers describe one process, e.g.:
+
+    uvicorn app.main:app --workers 1 --port 8000
+
+then step the number of concurrent clients and watch where throughput stops growing
+and latency starts climbing (threadpool or connection-pool exhaustion):
+
+    python -m benchmarks.bench_concurrency --base-url http://localhost:8000 \\
+        --scenario reservation --branch-slug kurttepe --levels 1,8,32,128,256
+
+Scenarios:
+  view         GET  /api/v1/musteri/sube/{slug}/table/{n}   (cycles --tables table numbers)
+  reservation  POST /api/v1/reservations/
+  message      POST /api/v1/messages/
+"""
+import argparse
+import asyncio
+import json
+from typing import List
+
+import httpx
+
+from benchmarks.loadgen import make_client, run_load
+
+
+def build_request(args: argparse.Namespace):
+    api = args.api_prefix.rstrip("/")
+
+    async def view(client: httpx.AsyncClient, seq: int) -> httpx.Response:
+        table_number = seq % args.tables + 1
+        return await client.get(f"{api}/musteri/sube/{args.branch_slug}/table/{table_number}")
+
+    async def reservation(client: httpx.AsyncClient, seq: int) -> httpx.Response:
+        return await client.post(f"{api}/reservations/", json={
+            "name": "Bench", "email": f"bench{seq}@example.com", "phone": "+900000000000",
+            "reservation_date": "2030-01-01", "reservation_time": "19:30:00", "guest_count": 2,
+            "branch_key": args.branch_slug, "consent": True,
+        })
+
+    async def message(client: httpx.AsyncClient, seq: int) -> httpx.Response:
+        return await client.post(f"{api}/messages/", json={
+            "name": "Bench", "email": f"bench{seq}@example.com", "message": "benchmark",
+            "branch_key": args.branch_slug,
+        })
+
+    return {"view": view, "reservation": reservation, "message": message}[args.scenario]
+
+
+async def main(args: argparse.Namespace) -> List[dict]:
+    levels = [int(level) for level in args.levels.split(",")]
+    make_request = build_request(args)
+    summaries = []
+    for concurrency in levels:
+        async with make_client(args.base_url, concurrency) as client:
+            result = await run_load(
+                client, make_request,
+                name=args.scenario, concurrency=concurrency, duration=args.duration,
+            )
+        print(result.line())
+        summaries.append(result.summary())
+    return summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--scenario", choices=["view", "reservation", "message"], default="view")
+    parser.add_argument("--branch-slug", default="kurttepe")
+    parser.add_argument("--tables", type=int, default=20, help="Number of tables cycled by the view scenario.")
+    parser.add_argument("--levels", default="1,8,32,128", help="Comma-separated concurrency levels.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level.")
+    parser.add_argument("--json", dest="json_path", help="Write machine-readable results to this file.")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(results, fh, indent=2)
@@ -0,0 +1,70 @@
+"""
+Per-request cost of access-token verification (security.decode_token).
+
+Measures, for the same token decoded over and over like a polling dashboard does:
+
+  uncached/jose    python-jose decode + TokenPayload validation (the old path)
+  uncached/pyjwt   PyJWT decode + validation (if PyJWT is installed)
+  cached           decode_token with the digest cache warm
+
+    python -m benchmarks.bench_jwt --iterations 20000
+"""
+import argparse
+import json
+import os
+import time
+from typing import Callable, Dict, List
+
+# The security module reads Settings at import; the values do not matter for a microbenchmark
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from app.core import security  # noqa: E402
+from app.core.cache import token_cache  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.schemas.auth import TokenPayload  # noqa: E402
+
+
+def measure(name: str, func: Callable[[], object], iterations: int) -> Dict[str, object]:
+    func()  # Warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / iterations * 1e6
+    print(f"{name:<16} {per_call_us:>9.2f} us/decode  {iterations / elapsed:>12.0f} decodes/s")
+    return {"name": name, "iterations": iterations, "us_per_decode": round(per_call_us, 3)}
+
+
+def main(args: argparse.Namespace) -> List[Dict[str, object]]:
+    token = security.create_access_token(subject=42)
+    results = []
+
+    def uncached_jose() -> object:
+        payload = security.jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+        return TokenPayload(**payload)
+    results.append(measure("uncached/jose", uncached_jose, args.iterations))
+
+    if security.pyjwt is not None:
+        def uncached_pyjwt() -> object:
+            payload = security.pyjwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+            return TokenPayload(**payload)
+        results.append(measure("uncached/pyjwt", uncached_pyjwt, args.iterations))
+    else:
+        print("uncached/pyjwt   skipped (PyJWT not installed)")
+
+    token_cache.clear()
+    results.append(measure("cached", lambda: security.decode_token(token), args.iterations))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--json", dest="json_path", help="Write machine-readable results to this file.")
+    args = parser.parse_args()
+
+    results = main(args)
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(results, fh, indent=2)
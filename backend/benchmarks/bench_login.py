@@ -0,0 +1,83 @@
+"""
+Login burst vs. regular-request latency on one worker.
+
+Runs a login load and a background load side by side, so you can see how much a burst of
+bcrypt work slows the rest of the API down. Compare two server runs:
+
+    PASSWORD_HASH_WORKERS=0 uvicorn app.main:app --workers 1 --port 8000   # before: inline bcrypt
+    PASSWORD_HASH_WORKERS=2 uvicorn app.main:app --workers 1 --port 8000   # after: process pool
+
+    python -m benchmarks.bench_login --username admin --password secret123 \\
+        --login-concurrency 16 --background-concurrency 8 --duration 15
+
+The background load defaults to the public QR view (--background-path). It is measured first
+alone (baseline), then together with the logins. Look at login throughput, 503s from a full
+hashing queue, and how far the background p95/p99 move from the baseline.
+"""
+import argparse
+import asyncio
+import json
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.loadgen import make_client, run_load
+
+
+async def main(args: argparse.Namespace) -> List[Dict[str, object]]:
+    api = args.api_prefix.rstrip("/")
+    login_form = {"username": args.username, "password": args.password}
+
+    async def login(client: httpx.AsyncClient, seq: int) -> httpx.Response:
+        return await client.post(f"{api}/auth/login", data=login_form)
+
+    async def background(client: httpx.AsyncClient, seq: int) -> httpx.Response:
+        return await client.get(args.background_path)
+
+    summaries = []
+    async with make_client(args.base_url, args.background_concurrency) as client:
+        baseline = await run_load(
+            client, background,
+            name="background (alone)", concurrency=args.background_concurrency, duration=args.duration,
+        )
+    print(baseline.line())
+    summaries.append(baseline.summary())
+
+    async with make_client(args.base_url, args.login_concurrency) as login_client, \
+            make_client(args.base_url, args.background_concurrency) as background_client:
+        logins, loaded = await asyncio.gather(
+            run_load(
+                login_client, login,
+                name="login", concurrency=args.login_concurrency, duration=args.duration,
+                ok_statuses={200},
+            ),
+            run_load(
+                background_client, background,
+                name="background (with logins)", concurrency=args.background_concurrency,
+                duration=args.duration,
+            ),
+        )
+    for result in (logins, loaded):
+        print(result.line())
+        summaries.append(result.summary())
+    print(f"login status counts: {logins.status_counts}")
+    return summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--background-path", default="/api/v1/musteri/sube/kurttepe/table/1")
+    parser.add_argument("--login-concurrency", type=int, default=16)
+    parser.add_argument("--background-concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per phase.")
+    parser.add_argument("--json", dest="json_path", help="Write machine-readable results to this file.")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(results, fh, indent=2)
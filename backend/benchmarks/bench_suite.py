@@ -0,0 +1,208 @@
+"""
+Benchmark suite for the public and admin API: fixed concurrency, one scenario after another.
+
+Seed a database (benchmarks.seed), start ONE worker on it and run the suite:
+
+    python -m benchmarks.seed --database-url postgresql+psycopg2://user:pw@localhost/bench
+    DATABASE_URL=postgresql+psycopg2://user:pw@localhost/bench uvicorn app.main:app --workers 1 --port 8000
+    python -m benchmarks.bench_suite --concurrency 16 --duration 15 --json results/$(git rev-parse --short HEAD).json
+
+    # Later, after a change: same command, then compare
+    python -m benchmarks.bench_suite --json results/new.json --compare results/old.json
+
+Scenarios:
+  view          GET  /musteri/sube/{slug}/table/{n}   random branch (skewed like the seed) and table
+  reservation   POST /reservations/                   random branch
+  login         POST /auth/login                      branch admins in turn (bcrypt bound)
+  admin_list    GET  /admin/reservations/?limit=50    first page, as a random branch admin
+
+Each scenario has a warm-up (not recorded), then reports p50/p95/p99, throughput, status
+counts and SQL statements per request. The statement count is the change in the worker's
+engine counters (/admin/monitoring/pool) divided by the requests, so it is exact with one
+worker and meaningless with several.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.loadgen import make_client, run_load
+from benchmarks.seed import (
+    ADMIN_USERNAME, BRANCH_SLUG, DEFAULT_BRANCHES, DEFAULT_PASSWORD, DEFAULT_TABLES_PER_BRANCH,
+    SUPERUSER_USERNAME, branch_weights,
+)
+
+SCENARIOS = ("view", "reservation", "login", "admin_list")
+COMPARED = (("throughput_rps", "req/s", 1), ("p50_ms", "p50", -1), ("p95_ms", "p95", -1), ("p99_ms", "p99", -1))
+
+
+class Suite:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.api = args.api_prefix.rstrip("/")
+        self.rng = random.Random(args.seed)
+        self.weights = branch_weights(args.branches)
+        self.admin_tokens: List[str] = []
+        self.root_token: Optional[str] = None
+
+    def branch_number(self) -> int:
+        return self.rng.choices(range(1, self.args.branches + 1), cum_weights=self.weights)[0]
+
+    async def login(self, client: httpx.AsyncClient, username: str) -> str:
+        response = await client.post(
+            f"{self.api}/auth/login", data={"username": username, "password": self.args.password}
+        )
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+    async def statements(self, client: httpx.AsyncClient) -> Optional[int]:
+        """SQL statements sent so far by the worker that answers (sync + async engine)."""
+        response = await client.get(
+            f"{self.api}/admin/monitoring/pool", headers={"Authorization": f"Bearer {self.root_token}"}
+        )
+        if response.status_code != 200:
+            return None
+        pools = response.json()
+        return sum(pool.get("statements", 0) for pool in pools.values())
+
+    def request_factory(self, scenario: str):
+        api, args = self.api, self.args
+
+        async def view(client: httpx.AsyncClient, seq: int) -> httpx.Response:
+            slug = BRANCH_SLUG.format(self.branch_number())
+            table_number = self.rng.randrange(1, args.tables_per_branch + 1)
+            return await client.get(f"{api}/musteri/sube/{slug}/table/{table_number}")
+
+        async def reservation(client: httpx.AsyncClient, seq: int) -> httpx.Response:
+            return await client.post(f"{api}/reservations/", json={
+                "name": "Bench", "email": f"bench{seq}@example.com", "phone": "+905550000000",
+                "reservation_date": "2030-01-01", "reservation_time": "19:30:00", "guest_count": 2,
+                "branch_key": BRANCH_SLUG.format(self.branch_number()), "consent": True,
+            })
+
+        async def login(client: httpx.AsyncClient, seq: int) -> httpx.Response:
+            username = ADMIN_USERNAME.format(seq % args.branches + 1)
+            return await client.post(f"{api}/auth/login", data={"username": username, "password": args.password})
+
+        async def admin_list(client: httpx.AsyncClient, seq: int) -> httpx.Response:
+            token = self.admin_tokens[seq % len(self.admin_tokens)]
+            return await client.get(
+                f"{api}/admin/reservations/", params={"limit": 50}, headers={"Authorization": f"Bearer {token}"}
+            )
+
+        return {"view": view, "reservation": reservation, "login": login, "admin_list": admin_list}[scenario]
+
+    async def run(self, scenario: str) -> Dict[str, Any]:
+        args = self.args
+        concurrency = args.login_concurrency if scenario == "login" else args.concurrency
+        ok_statuses = {200} if scenario == "login" else None
+        make_request = self.request_factory(scenario)
+        async with make_client(args.base_url, concurrency) as client:
+            if args.warmup > 0:
+                await run_load(client, make_request, name=scenario, concurrency=concurrency, duration=args.warmup)
+            before = await self.statements(client)
+            result = await run_load(
+                client, make_request,
+                name=scenario, concurrency=concurrency, duration=args.duration, ok_statuses=ok_statuses,
+            )
+            after = await self.statements(client)
+        summary = result.summary()
+        summary["queries_per_request"] = (
+            round((after - before) / result.requests, 2) if before is not None and after is not None and result.requests else None
+        )
+        print(f"{result.line()}  queries/req={summary['queries_per_request']}")
+        return summary
+
+    async def main(self) -> Dict[str, Any]:
+        args = self.args
+        async with make_client(args.base_url, 4) as client:
+            self.root_token = await self.login(client, SUPERUSER_USERNAME)
+            self.admin_tokens = [
+                await self.login(client, ADMIN_USERNAME.format(i + 1)) for i in range(min(args.admins, args.branches))
+            ]
+            server_pools = (await client.get(
+                f"{self.api}/admin/monitoring/pool", headers={"Authorization": f"Bearer {self.root_token}"}
+            )).json()
+        results = [await self.run(scenario) for scenario in args.scenarios]
+        return {"meta": meta(args, server_pools), "results": results}
+
+
+def meta(args: argparse.Namespace, server_pools: Any) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "host": platform.node(),
+        "base_url": args.base_url,
+        "scenarios": list(args.scenarios),
+        "concurrency": args.concurrency,
+        "login_concurrency": args.login_concurrency,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "branches": args.branches,
+        "tables_per_branch": args.tables_per_branch,
+        "server_pool_classes": {name: pool.get("pool_class") for name, pool in server_pools.items()},
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Prints the change of every scenario against a previous --json file."""
+    old = {result["name"]: result for result in baseline["results"]}
+    print(f"\nvs {baseline['meta'].get('git_commit')} ({baseline['meta'].get('timestamp')})")
+    for result in current["results"]:
+        base = old.get(result["name"])
+        if base is None:
+            continue
+        parts = []
+        for key, label, better in COMPARED:
+            if base[key]:
+                change = (result[key] - base[key]) / base[key] * 100
+                flag = "" if abs(change) < 5 else (" +" if change * better > 0 else " -")
+                parts.append(f"{label} {change:+6.1f}%{flag}")
+        if result.get("queries_per_request") is not None and base.get("queries_per_request") is not None:
+            parts.append(f"queries/req {base['queries_per_request']} -> {result['queries_per_request']}")
+        print(f"{result['name']:<14} " + "  ".join(parts))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=list(SCENARIOS),
+                        help=f"Comma-separated subset of {','.join(SCENARIOS)}.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--login-concurrency", type=int, default=4, help="Logins are bcrypt bound; keep this low.")
+    parser.add_argument("--duration", type=float, default=15.0, help="Recorded seconds per scenario.")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unrecorded seconds before each scenario.")
+    parser.add_argument("--branches", type=int, default=DEFAULT_BRANCHES, help="As passed to benchmarks.seed.")
+    parser.add_argument("--tables-per-branch", type=int, default=DEFAULT_TABLES_PER_BRANCH, help="As passed to benchmarks.seed.")
+    parser.add_argument("--admins", type=int, default=8, help="Branch admins whose tokens admin_list rotates through.")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", dest="json_path", help="Write machine-readable results to this file.")
+    parser.add_argument("--compare", dest="baseline_path", help="Previous --json file to compare against.")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(Suite(args).main())
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(report, fh, indent=2)
+    if args.baseline_path:
+        with open(args.baseline_path) as fh:
+            compare(report, json.load(fh))
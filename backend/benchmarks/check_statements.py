@@ -0,0 +1,180 @@
+"""
+Statement budget per endpoint: fails (exit 1) when a request sends more SQL statements than allowed.
+
+Drives the API in-process (TestClient) against a throwaway database and counts the statements
+both engines send for each request, BEGIN/COMMIT excluded. Run it after touching a CRUD write
+path or a dependency, e.g. to catch a refresh() SELECT after commit creeping back in:
+
+    python -m benchmarks.check_statements                      # temporary SQLite file
+    python -m benchmarks.check_statements --database-url postgresql+psycopg2://user:pw@localhost/bench_empty -v
+
+The database is dropped and recreated with SQLModel metadata, so never point it at real data.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+# (name, budget): every write is one statement plus commit; caches (principal, token, branch
+# registry, table view) are warm, as they are after a worker's first few requests
+BUDGETS: Dict[str, int] = {
+    "signup": 2,                      # existence check, INSERT
+    "me": 0,                          # principal and token from cache
+    "create branch": 2,               # slug check, INSERT
+    "rename branch": 4,               # access check, slug check, table links UPDATE, branch UPDATE
+    "bulk create tables": 3,          # branch, existing numbers, multi-row INSERT ... RETURNING
+    "update table": 2,                # SELECT, UPDATE (link regenerated in the same statement)
+    "view (cold)": 1,                 # branch + table in one join
+    "view (warm)": 0,
+    "create reservation": 2,          # capacity FOR SHARE, INSERT (branch key from the registry: no query)
+    "create message": 1,
+    "create application": 1,
+    "update reservation status": 2,   # SELECT, UPDATE
+    "list reservations": 1,
+    "delete tables": 1,               # DELETE ... RETURNING
+    "availability (unlimited)": 0,    # no capacity: answered from the branch registry
+    "set capacity": 6,                # access check, branch lock, counters DELETE, reservations aggregate, counters INSERT, UPDATE
+    "create reservation (capacity)": 3,  # capacity and grid FOR SHARE, conditional slot counter upsert, INSERT
+    "availability": 1,                # slot counters of one date (primary key range)
+    "reservation outside hours": 1,   # capacity and grid FOR SHARE, then 422 before any write
+}
+# SQLite cannot return a multi-row INSERT's rows in parameter order, so SQLAlchemy sends one per row
+SQLITE_BUDGETS: Dict[str, int] = {
+    "bulk create tables": 2 + 20,
+}
+
+
+def main(args: argparse.Namespace) -> int:
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "statement-budget")
+    os.environ["PASSWORD_HASH_WORKERS"] = "0" # Hash inline: no spawned pool in a script
+    os.environ["WRITE_BEHIND_ENABLED"] = "false"
+    os.environ["CV_STORAGE_BACKEND"] = "local"
+    os.environ["CV_STORAGE_LOCAL_DIR"] = tempfile.mkdtemp(prefix="cv-")
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlmodel import SQLModel
+
+    from app import crud, schemas
+    from app.db.session import SessionLocal, async_engine, engine
+    from app.main import app
+
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with SessionLocal() as db:
+        branch = crud.branch.create(db, obj_in=schemas.BranchSettingCreate(
+            name="Budget", slug="budget", default_links={"order": "https://example.com"}, link_order=["order"],
+        ))
+        crud.user.create(db, obj_in=schemas.UserCreate(
+            email="admin@example.com", username="admin", password="password123", branch_id=branch.id,
+        ))
+        crud.user.create(db, obj_in=schemas.UserCreate(
+            email="root@example.com", username="root", password="password123", is_superuser=True,
+        ))
+        branch_id = branch.id
+
+    budgets = dict(BUDGETS, **SQLITE_BUDGETS) if engine.dialect.name == "sqlite" else BUDGETS
+    statements: List[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(" ".join(statement.split())[:120])
+
+    for sync_engine in (engine, async_engine.sync_engine):
+        event.listen(sync_engine, "before_cursor_execute", count)
+
+    api = "/api/v1"
+    reservation = {
+        "name": "A", "email": "a@example.com", "phone": "1", "reservation_date": "2030-01-01",
+        "reservation_time": "19:30:00", "guest_count": 2, "branch_key": "budget", "consent": True,
+    }
+    failures = 0
+    with TestClient(app) as client:
+        def login(username: str) -> Dict[str, str]:
+            response = client.post(f"{api}/auth/login", data={"username": username, "password": "password123"})
+            response.raise_for_status()
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            client.get(f"{api}/auth/me", headers=headers) # Warm the principal cache
+            return headers
+
+        admin, root = login("admin"), login("root")
+        client.post(f"{api}/reservations/", json=reservation) # Warm the branch registry
+
+        def check(name: str, call: Callable[[], object], status: Optional[int] = None) -> object:
+            """Runs one request; it must succeed, or answer `status` when given."""
+            nonlocal failures
+            statements.clear()
+            response = call()
+            if response.status_code != status if status is not None else response.status_code >= 400:
+                print(f"ERROR {name}: HTTP {response.status_code} {response.text[:200]}")
+                failures += 1
+                return response
+            used, budget = len(statements), budgets[name]
+            ok = used <= budget
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<28} {used:>2} / {budget}")
+            if args.verbose or not ok:
+                for statement in statements:
+                    print(f"       {statement}")
+            return response
+
+        check("signup", lambda: client.post(f"{api}/users/signup", json={
+            "email": "new@example.com", "username": "new", "password": "password123",
+        }))
+        check("me", lambda: client.get(f"{api}/auth/me", headers=admin))
+        check("create branch", lambda: client.post(f"{api}/admin/settings/branches/", headers=root, json={
+            "name": "Other", "slug": "other", "default_links": {}, "link_order": [],
+        }))
+        tables = check("bulk create tables", lambda: client.post(
+            f"{api}/admin/tables/bulk", headers=admin, json={"start_number": 1, "end_number": 20},
+        )).json()
+        check("update table", lambda: client.put(
+            f"{api}/admin/tables/{tables[0]['id']}", headers=admin, json={"override_main_qr_link": "https://example.com/t1"},
+        ))
+        check("rename branch", lambda: client.put(
+            f"{api}/admin/settings/branches/{branch_id}", headers=admin, json={"slug": "budget2"},
+        ))
+        reservation["branch_key"] = "budget2"
+        admin = login("admin") # The rename dropped the cached principal (it carries the slug)
+        check("view (cold)", lambda: client.get(f"{api}/musteri/sube/budget2/table/2"))
+        check("view (warm)", lambda: client.get(f"{api}/musteri/sube/budget2/table/2"))
+        created = check("create reservation", lambda: client.post(f"{api}/reservations/", json=reservation)).json()
+        check("create message", lambda: client.post(f"{api}/messages/", json={
+            "name": "A", "email": "a@example.com", "message": "hi", "branch_key": "budget2",
+        }))
+        check("create application", lambda: client.post(f"{api}/applications/", data={
+            "name": "A", "email": "a@example.com", "phone": "1", "birthdate": "1990-01-01", "branch_key": "budget2",
+            "department": "Kitchen", "experience_years": "1", "privacy_policy_accepted": "true",
+        }, files={"cv_file": ("cv.pdf", b"%PDF-1.4 budget", "application/pdf")}))
+        check("update reservation status", lambda: client.patch(
+            f"{api}/admin/reservations/{created['id']}", headers=admin, json={"status": "confirmed"},
+        ))
+        check("list reservations", lambda: client.get(f"{api}/admin/reservations/", headers=admin))
+        check("delete tables", lambda: client.request(
+            "DELETE", f"{api}/admin/tables/bulk", headers=admin, json={"table_ids": [t["id"] for t in tables[:5]]},
+        ))
+        availability = {"branch_key": "budget2", "reservation_date": "2030-01-01", "guest_count": 2}
+        check("availability (unlimited)", lambda: client.get(f"{api}/reservations/availability", params=availability))
+        check("set capacity", lambda: client.put(
+            f"{api}/admin/settings/branches/{branch_id}", headers=admin, json={"reservation_capacity": 40},
+        ))
+        check("create reservation (capacity)", lambda: client.post(f"{api}/reservations/", json=reservation))
+        check("availability", lambda: client.get(f"{api}/reservations/availability", params=availability))
+        check("reservation outside hours", lambda: client.post(
+            f"{api}/reservations/", json=dict(reservation, reservation_time="23:45:00"),
+        ), status=422)
+
+    print("statement budget exceeded" if failures else "all within budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--database-url",
+        default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'statement_budget.db')}",
+        help="Sync SQLAlchemy URL of a disposable database (dropped and recreated).",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every statement.")
+    sys.exit(main(parser.parse_args()))
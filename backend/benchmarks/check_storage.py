@@ -0,0 +1,166 @@
+"""
+Storage round trip: put, ranged reads, stat and delete through a CV storage backend; fails (exit 1)
+on the first difference from what the upload endpoint and the CV download (Range requests) rely on.
+
+    python -m benchmarks.check_storage                     # local backend + S3 on moto (pip install moto)
+    python -m benchmarks.check_storage --backend local
+    # A real S3-compatible server; the bucket must exist and the prefix is cleaned up afterwards
+    python -m benchmarks.check_storage --backend s3 --bucket cv-check --endpoint-url http://localhost:9000 \\
+        --access-key-id minio --secret-access-key minio-secret
+
+Each backend gets a small object (one PutObject on S3) and one larger than a multipart part, so the
+multipart upload, its abort and reads across a part boundary are covered too.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+# app.storage reads Settings at import; the values do not matter here
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "storage-check")
+
+from app.storage import LocalStorage, Storage  # noqa: E402
+
+SMALL = b"%PDF-1.4 " + bytes(range(256)) * 40                    # ~10 KiB: a single PutObject on S3
+LARGE = os.urandom(8 * 1024 * 1024) + os.urandom(1024 * 1024 + 7)  # One full multipart part plus a remainder
+
+
+class Failed(Exception):
+    pass
+
+
+def expect(condition: bool, message: str) -> None:
+    if not condition:
+        raise Failed(message)
+
+
+async def chunked(data: bytes, size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    for offset in range(0, len(data), size):
+        yield data[offset:offset + size]
+
+
+async def read(storage: Storage, key: str, *, start: int = 0, end: Optional[int] = None) -> bytes:
+    return b"".join([chunk async for chunk in storage.stream_get(key, start=start, end=end)])
+
+
+async def round_trip(storage: Storage, key: str, data: bytes) -> None:
+    stored = await storage.put(key, chunked(data), content_type="application/pdf")
+    expect(stored.size == len(data), f"{key}: put reported {stored.size} bytes, wrote {len(data)}")
+
+    stat = await storage.stat(key)
+    expect(stat is not None, f"{key}: stat found nothing after put")
+    expect(stat.size == len(data), f"{key}: stat size {stat.size}, expected {len(data)}")
+    expect(stat.last_modified.tzinfo is not None, f"{key}: last_modified is not timezone-aware")
+
+    expect(await read(storage, key) == data, f"{key}: full read differs")
+    last = len(data) - 1
+    middle = len(data) // 2
+    for start, end in ((0, 0), (0, 99), (100, 199), (middle - 3, middle + 3), (last, last), (last - 9, None)):
+        expected = data[start:None if end is None else end + 1]
+        got = await read(storage, key, start=start, end=end)
+        expect(got == expected, f"{key}: bytes {start}-{'' if end is None else end} returned {len(got)} bytes, expected {len(expected)}")
+
+    await storage.delete(key)
+    expect(await storage.stat(key) is None, f"{key}: still there after delete")
+    await storage.delete(key) # Missing keys are ignored
+
+
+async def aborted_upload(storage: Storage, key: str, data: bytes) -> None:
+    async def failing() -> AsyncIterator[bytes]:
+        async for chunk in chunked(data):
+            yield chunk
+        raise RuntimeError("client went away")
+
+    try:
+        await storage.put(key, failing())
+    except RuntimeError:
+        pass
+    else:
+        raise Failed(f"{key}: put swallowed the upload error")
+    expect(await storage.stat(key) is None, f"{key}: aborted upload is visible")
+
+
+async def check(storage: Storage, prefix: str) -> List[str]:
+    checks = (
+        ("small object", round_trip(storage, f"{prefix}small.pdf", SMALL)),
+        ("multipart object", round_trip(storage, f"{prefix}large.pdf", LARGE)),
+        ("aborted small upload", aborted_upload(storage, f"{prefix}aborted-small.pdf", SMALL)),
+        ("aborted multipart upload", aborted_upload(storage, f"{prefix}aborted-large.pdf", LARGE)),
+    )
+    failures = []
+    for name, coroutine in checks:
+        try:
+            await coroutine
+            print(f"  ok    {name}")
+        except Failed as e:
+            print(f"  FAIL  {name}: {e}")
+            failures.append(str(e))
+    missing = await storage.stat(f"{prefix}missing.pdf")
+    if missing is not None:
+        failures.append("stat of a missing key returned an object")
+    return failures
+
+
+def open_uploads(storage: Storage) -> int:
+    """Multipart uploads left open in the bucket (an abort that did not reach S3)."""
+    response = storage.client.list_multipart_uploads(Bucket=storage.bucket, Prefix=storage.prefix)
+    return len(response.get("Uploads", []))
+
+
+async def main(args: argparse.Namespace) -> int:
+    failures: List[str] = []
+    prefix = f"check-{uuid.uuid4().hex[:8]}-"
+    with ExitStack() as stack:
+        if args.backend in ("all", "local"):
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+            print("local")
+            failures += await check(LocalStorage(Path(directory)), prefix)
+
+        if args.backend in ("all", "s3"):
+            from app.storage.s3 import S3Storage
+
+            on_moto = args.backend == "all" # --backend s3 talks to the configured server
+            if on_moto:
+                try:
+                    from moto import mock_aws
+                except ImportError:
+                    print("S3 on moto needs the moto package (pip install moto), or use --backend s3 with a server")
+                    return 1
+                os.environ.setdefault("AWS_ACCESS_KEY_ID", "check")
+                os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "check")
+                stack.enter_context(mock_aws())
+            print(f"s3 ({'moto' if on_moto else args.endpoint_url or 'AWS'})")
+            storage = S3Storage(
+                bucket=args.bucket, prefix=args.prefix + prefix, endpoint_url=None if on_moto else args.endpoint_url,
+                region_name=args.region, access_key_id=args.access_key_id, secret_access_key=args.secret_access_key,
+            )
+            if on_moto:
+                storage.client.create_bucket(
+                    Bucket=args.bucket, CreateBucketConfiguration={"LocationConstraint": args.region},
+                )
+            failures += await check(storage, "")
+            if open_uploads(storage):
+                print("  FAIL  aborted multipart upload is still open")
+                failures.append("multipart upload left open")
+
+    print("storage round trip failed" if failures else "storage round trip ok")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("all", "local", "s3"), default="all",
+                        help="all = local and S3 on moto; s3 = the server given by the S3 options.")
+    parser.add_argument("--bucket", default="cv-check")
+    parser.add_argument("--prefix", default="", help="Prepended to the random per-run key prefix.")
+    parser.add_argument("--endpoint-url")
+    parser.add_argument("--region", default="eu-central-1")
+    parser.add_argument("--access-key-id")
+    parser.add_argument("--secret-access-key")
+    sys.exit(asyncio.run(main(parser.parse_args())))
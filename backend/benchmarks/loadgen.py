@@ -0,0 +1,98 @@
+"""
+Small closed-loop load generator shared by the benchmark scripts.
+
+Each of `concurrency` workers sends a request, waits for the answer and immediately sends
+the next one, for `duration` seconds. Latencies are collected per request.
+"""
+import asyncio
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+RequestFactory = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+@dataclass
+class LoadResult:
+    name: str
+    concurrency: int
+    duration_s: float
+    requests: int = 0
+    errors: int = 0
+    status_counts: Dict[int, int] = field(default_factory=dict)
+    latencies_ms: List[float] = field(default_factory=list, repr=False)
+
+    @property
+    def throughput_rps(self) -> float:
+        return self.requests / self.duration_s if self.duration_s else 0.0
+
+    def summary(self) -> Dict[str, object]:
+        ordered = sorted(self.latencies_ms)
+        data = asdict(self)
+        data.pop("latencies_ms")
+        data.update(
+            throughput_rps=round(self.throughput_rps, 1),
+            p50_ms=round(percentile(ordered, 50), 2),
+            p95_ms=round(percentile(ordered, 95), 2),
+            p99_ms=round(percentile(ordered, 99), 2),
+            mean_ms=round(statistics.fmean(ordered), 2) if ordered else 0.0,
+        )
+        return data
+
+    def line(self) -> str:
+        s = self.summary()
+        return (
+            f"{self.name:<28} c={self.concurrency:<4} {s['throughput_rps']:>9} req/s  "
+            f"p50={s['p50_ms']:>8}ms  p95={s['p95_ms']:>8}ms  p99={s['p99_ms']:>8}ms  errors={self.errors}"
+        )
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    make_request: RequestFactory,
+    *,
+    name: str,
+    concurrency: int,
+    duration: float,
+    ok_statuses: Optional[set] = None,
+) -> LoadResult:
+    """Drives make_request(client, seq) from `concurrency` workers for `duration` seconds."""
+    ok_statuses = ok_statuses or {200, 201, 202, 304}
+    result = LoadResult(name=name, concurrency=concurrency, duration_s=duration)
+    deadline = time.perf_counter() + duration
+    counter = iter(range(10**12))
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            seq = next(counter)
+            start = time.perf_counter()
+            try:
+                response = await make_request(client, seq)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            result.latencies_ms.append((time.perf_counter() - start) * 1000)
+            result.requests += 1
+            result.status_counts[status] = result.status_counts.get(status, 0) + 1
+            if status not in ok_statuses:
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.duration_s = time.perf_counter() - started
+    return result
+
+
+def make_client(base_url: str, concurrency: int, **kwargs) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0, **kwargs)
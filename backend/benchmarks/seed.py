@@ -0,0 +1,189 @@
+"""
+Seeds a database with production-like volumes for the benchmark suite (benchmarks.bench_suite).
+
+    # Schema from migrations, then seed (defaults: 40 branches x 100 tables, 2M reservations, 1M messages)
+    DATABASE_URL=postgresql+psycopg2://user:pw@localhost/bench alembic upgrade head
+    python -m benchmarks.seed --database-url postgresql+psycopg2://user:pw@localhost/bench
+
+    # Quick SQLite stand-in, schema created from the models
+    python -m benchmarks.seed --database-url sqlite:////tmp/bench.db --reset --reservations 200000 --messages 100000
+
+What it creates (deterministic for a given --seed):
+  branches      bench-01 .. bench-NN, traffic skewed towards the first ones (Zipf-like)
+  tables        1..--tables-per-branch in every branch, default links
+  users         bench-admin-01 .. bench-admin-NN (one per branch) and the superuser bench-root,
+                all with --password
+  reservations  spread over the last two years, mixed statuses
+  messages      ~10% with a branch key that matches no branch (branch_id NULL)
+  applications  with CV keys that do not exist in storage (downloads are not benchmarked)
+
+Rows go in with multi-row INSERTs in batches of --batch-size, one transaction per batch.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterator, List
+
+# Names shared with benchmarks.bench_suite
+BRANCH_SLUG = "bench-{:02d}"
+ADMIN_USERNAME = "bench-admin-{:02d}"
+SUPERUSER_USERNAME = "bench-root"
+DEFAULT_PASSWORD = "bench-password"
+DEFAULT_BRANCHES = 40
+DEFAULT_TABLES_PER_BRANCH = 100
+
+LINKS = {
+    "order": "https://order.example.com/{slug}",
+    "feedback": "https://g.page/{slug}/review",
+    "instagram": "https://instagram.com/{slug}",
+    "whatsapp": "https://wa.me/905000000000",
+}
+
+
+def branch_weights(branches: int) -> List[float]:
+    """Cumulative weights: branch i gets traffic ~ 1 / (i + 1)^0.8."""
+    return list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(branches)))
+
+
+def batches(make_row: Callable[[int], Dict[str, Any]], total: int, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    for start in range(0, total, batch_size):
+        yield [make_row(i) for i in range(start, min(total, start + batch_size))]
+
+
+def main(args: argparse.Namespace) -> None:
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-seed")
+    os.environ["PASSWORD_HASH_WORKERS"] = "0" # One hash, inline
+
+    from sqlalchemy import insert, select, text
+    from sqlmodel import SQLModel
+
+    from app.core.security import get_password_hash
+    from app.db.session import engine
+    from app.models.models import Application, BranchSetting, ManagedTable, Message, Reservation, ReservationStatus, User
+    from app.utils.links import build_table_link
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    two_years = 730 * 24 * 3600
+
+    if args.reset:
+        SQLModel.metadata.drop_all(engine)
+        SQLModel.metadata.create_all(engine)
+
+    def insert_all(model: Any, rows: Iterator[List[Dict[str, Any]]], total: int) -> None:
+        done, start = 0, time.perf_counter()
+        for batch in rows:
+            with engine.begin() as conn:
+                conn.execute(insert(model.__table__), batch)
+            done += len(batch)
+            rate = done / (time.perf_counter() - start)
+            print(f"\r{model.__tablename__:<14} {done:>10,} / {total:,}  ({rate:,.0f} rows/s)", end="", flush=True)
+        print()
+
+    # Branches, tables, users
+    slugs = [BRANCH_SLUG.format(i + 1) for i in range(args.branches)]
+    with engine.begin() as conn:
+        if conn.execute(select(BranchSetting.id).where(BranchSetting.slug.in_(slugs)).limit(1)).first():
+            sys.exit("Benchmark branches already exist; use --reset (drops every table) or a fresh database.")
+        branch_ids = list(conn.execute(
+            insert(BranchSetting.__table__).returning(BranchSetting.id, sort_by_parameter_order=True),
+            [
+                {
+                    "name": f"Bench Branch {i + 1:02d}",
+                    "slug": slug,
+                    "display_whatsapp_number": "+905000000000",
+                    "default_links": {key: url.format(slug=slug) for key, url in LINKS.items()},
+                    "link_order": list(LINKS),
+                }
+                for i, slug in enumerate(slugs)
+            ],
+        ).scalars())
+        conn.execute(insert(ManagedTable.__table__), [
+            {"branch_id": branch_id, "table_number": number, "link": build_table_link(slug, number)}
+            for branch_id, slug in zip(branch_ids, slugs)
+            for number in range(1, args.tables_per_branch + 1)
+        ])
+        hashed_password = get_password_hash(args.password)
+        conn.execute(insert(User.__table__), [
+            {
+                "username": ADMIN_USERNAME.format(i + 1), "email": f"bench-admin-{i + 1:02d}@example.com",
+                "hashed_password": hashed_password, "is_active": True, "is_superuser": False, "branch_id": branch_id,
+            }
+            for i, branch_id in enumerate(branch_ids)
+        ] + [{
+            "username": SUPERUSER_USERNAME, "email": "bench-root@example.com",
+            "hashed_password": hashed_password, "is_active": True, "is_superuser": True, "branch_id": None,
+        }])
+    print(f"branches {len(branch_ids)}, tables {len(branch_ids) * args.tables_per_branch:,}, users {len(branch_ids) + 1}")
+
+    weights = branch_weights(len(branch_ids))
+    statuses = [ReservationStatus.PENDING, ReservationStatus.CONFIRMED, ReservationStatus.CANCELLED]
+
+    def pick_branch() -> int:
+        return rng.choices(range(len(branch_ids)), cum_weights=weights)[0]
+
+    def received_at() -> datetime:
+        return now - timedelta(seconds=rng.randrange(two_years))
+
+    def reservation_row(i: int) -> Dict[str, Any]:
+        b, at = pick_branch(), received_at()
+        return {
+            "name": f"Guest {i}", "email": f"guest{i % 50000}@example.com", "phone": f"+90555{i % 10000000:07d}",
+            "reservation_date": (at + timedelta(days=rng.randrange(30))).date(),
+            "reservation_time": datetime(2000, 1, 1, rng.randrange(11, 23), rng.choice((0, 15, 30, 45))).time(),
+            "guest_count": rng.randrange(1, 12), "branch_key": slugs[b], "branch_id": branch_ids[b],
+            "message": None if rng.random() < 0.7 else "Pencere kenarı lütfen.", "consent": True,
+            "status": rng.choices(statuses, weights=(20, 70, 10))[0], "received_at": at,
+        }
+
+    def message_row(i: int) -> Dict[str, Any]:
+        b = pick_branch()
+        unmatched = rng.random() < 0.1
+        return {
+            "name": f"Visitor {i}", "email": f"visitor{i % 50000}@example.com", "phone": None,
+            "subject": rng.choice((None, "Öneri", "Şikayet", "Teşekkür")), "message": "Benchmark message body. " * 4,
+            "branch_key": "genel" if unmatched else slugs[b], "branch_id": None if unmatched else branch_ids[b],
+            "received_at": received_at(),
+        }
+
+    def application_row(i: int) -> Dict[str, Any]:
+        b = pick_branch()
+        return {
+            "name": f"Applicant {i}", "email": f"applicant{i}@example.com", "phone": "+905550000000",
+            "birthdate": datetime(1980 + rng.randrange(25), 1 + rng.randrange(12), 1 + rng.randrange(28)).date(),
+            "branch_key": slugs[b], "branch_id": branch_ids[b], "department": rng.choice(("Mutfak", "Servis", "Kasa")),
+            "experience_years": rng.randrange(0, 20), "message": None, "privacy_policy_accepted": True,
+            "cv_file_path": f"bench/applicant{i}.pdf", "submitted_at": received_at(),
+        }
+
+    insert_all(Reservation, batches(reservation_row, args.reservations, args.batch_size), args.reservations)
+    insert_all(Message, batches(message_row, args.messages, args.batch_size), args.messages)
+    insert_all(Application, batches(application_row, args.applications, args.batch_size), args.applications)
+
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE"))
+    elif engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+    print("done")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), required="DATABASE_URL" not in os.environ)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate every table from the models first.")
+    parser.add_argument("--branches", type=int, default=DEFAULT_BRANCHES)
+    parser.add_argument("--tables-per-branch", type=int, default=DEFAULT_TABLES_PER_BRANCH)
+    parser.add_argument("--reservations", type=int, default=2_000_000)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--applications", type=int, default=20_000)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password of every seeded user.")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
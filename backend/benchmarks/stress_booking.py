@@ -0,0 +1,172 @@
+"""
+Booking under contention: hundreds of concurrent reservations for the same slot must never
+overbook it, and must not be much slower than bookings that don't compete.
+
+Needs a running server and a superuser (the benchmarks.seed one by default). Every run creates
+fresh branches, so it can be repeated against the same database:
+
+    uvicorn app.main:app --workers 4 --port 8000
+    python -m benchmarks.stress_booking --attempts 500 --concurrency 200
+    # Also compare the counter with the reservation rows themselves
+    python -m benchmarks.stress_booking --database-url postgresql+psycopg2://user:pw@localhost/bench
+
+Phases (each fires --attempts bookings of --guests guests, --concurrency at a time):
+  unlimited   branch without capacity: the plain INSERT path, the throughput reference
+  hot         capacity branch, every attempt on the same slot: all but capacity / guests get 409
+  spread      capacity branch, attempts round-robin over all slots of a day
+
+Fails (exit 1) if a slot took more guests than its capacity, if a slot that was asked for more
+than its capacity is not full, or if the counter disagrees with the accepted bookings.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import date, time as time_of_day
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.loadgen import LoadResult, make_client
+from benchmarks.seed import DEFAULT_PASSWORD, SUPERUSER_USERNAME
+
+FIRST_SLOT, LAST_SLOT, SLOT_MINUTES = time_of_day(12, 0), time_of_day(22, 0), 30
+
+
+async def burst(client: httpx.AsyncClient, bookings: List[Dict[str, Any]], *, name: str, concurrency: int) -> LoadResult:
+    """Sends every booking once, at most `concurrency` in flight."""
+    result = LoadResult(name=name, concurrency=concurrency, duration_s=0.0)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def book(body: Dict[str, Any]) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                status = (await client.post("/reservations/", json=body)).status_code
+            except httpx.HTTPError:
+                status = 0
+            result.latencies_ms.append((time.perf_counter() - start) * 1000)
+            result.requests += 1
+            result.status_counts[status] = result.status_counts.get(status, 0) + 1
+            if status not in (201, 202, 409):
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(book(body) for body in bookings))
+    result.duration_s = time.perf_counter() - started
+    print(f"{result.line()}  statuses={dict(sorted(result.status_counts.items()))}")
+    return result
+
+
+def booking(slug: str, day: date, at: time_of_day, seq: int, guests: int) -> Dict[str, Any]:
+    return {
+        "name": "Stress", "email": f"stress{seq}@example.com", "phone": "+905550000000",
+        "reservation_date": day.isoformat(), "reservation_time": at.isoformat(), "guest_count": guests,
+        "branch_key": slug, "consent": True,
+    }
+
+
+async def main(args: argparse.Namespace) -> int:
+    api = args.api_prefix.rstrip("/")
+    run = int(time.time())
+    hot_day, spread_day = date(2031, 1, 1), date(2031, 1, 2)
+    async with make_client(args.base_url + api, args.concurrency) as client:
+        response = await client.post("/auth/login", data={"username": args.username, "password": args.password})
+        response.raise_for_status()
+        root = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        branches = {}
+        for kind, capacity in (("unlimited", None), ("limited", args.capacity)):
+            slug = f"stress-{run}-{kind}"
+            response = await client.post("/admin/settings/branches/", headers=root, json={
+                "name": f"Stress {run} {kind}", "slug": slug, "default_links": {}, "link_order": [],
+                "reservation_capacity": capacity, "reservation_slot_minutes": SLOT_MINUTES,
+                "reservation_opens_at": FIRST_SLOT.isoformat(), "reservation_last_slot_at": LAST_SLOT.isoformat(),
+            })
+            response.raise_for_status()
+            branches[kind] = response.json()
+        limited = branches["limited"]["slug"]
+        slots = (await client.get("/reservations/availability", params={
+            "branch_key": limited, "reservation_date": spread_day.isoformat(),
+        })).json()["slots"]
+        slot_starts = [time_of_day.fromisoformat(slot["reservation_time"]) for slot in slots]
+        hot_slot = time_of_day(19, 30)
+
+        n, guests = args.attempts, args.guests
+        results = {
+            "unlimited": await burst(client, [
+                booking(branches["unlimited"]["slug"], hot_day, hot_slot, i, guests) for i in range(n)
+            ], name="unlimited", concurrency=args.concurrency),
+            "hot": await burst(client, [
+                booking(limited, hot_day, hot_slot, i, guests) for i in range(n)
+            ], name="hot (one slot)", concurrency=args.concurrency),
+            "spread": await burst(client, [
+                booking(limited, spread_day, slot_starts[i % len(slot_starts)], n + i, guests) for i in range(n)
+            ], name=f"spread ({len(slot_starts)} slots)", concurrency=args.concurrency),
+        }
+
+        failures: List[str] = []
+        for label, day, result, asked in (
+            ("hot", hot_day, results["hot"], {hot_slot: n * guests}),
+            ("spread", spread_day, results["spread"], {
+                at: len(range(i, n, len(slot_starts))) * guests for i, at in enumerate(slot_starts)
+            }),
+        ):
+            remaining = {
+                time_of_day.fromisoformat(slot["reservation_time"]): slot["remaining_guests"]
+                for slot in (await client.get("/reservations/availability", params={
+                    "branch_key": limited, "reservation_date": day.isoformat(),
+                })).json()["slots"]
+            }
+            booked = {at: args.capacity - remaining[at] for at in asked}
+            accepted = result.status_counts.get(201, 0) * guests
+            if sum(booked.values()) != accepted:
+                failures.append(f"{label}: counters hold {sum(booked.values())} guests, {accepted} were accepted")
+            for at, wanted in asked.items():
+                if booked[at] > args.capacity:
+                    failures.append(f"{label} {at}: {booked[at]} guests booked, capacity {args.capacity}")
+                expected = min(wanted, args.capacity // guests * guests)
+                if booked[at] != expected:
+                    failures.append(f"{label} {at}: {booked[at]} guests booked, expected {expected}")
+            if args.database_url:
+                failures += check_rows(args.database_url, branches["limited"]["id"], day, booked, label)
+
+    reference = results["unlimited"].throughput_rps
+    for label in ("hot", "spread"):
+        if reference:
+            print(f"{label:<8} throughput {results[label].throughput_rps / reference:6.0%} of unlimited")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("overbooking detected" if failures else "no overbooking")
+    return 1 if failures else 0
+
+
+def check_rows(database_url: str, branch_id: int, day: date, booked: Dict[time_of_day, int], label: str) -> List[str]:
+    """The counter must equal the guests of the stored (not cancelled) reservations per slot."""
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        rows = dict(conn.execute(text(
+            "SELECT reservation_time, SUM(guest_count) FROM reservation"
+            " WHERE branch_id = :branch_id AND reservation_date = :day GROUP BY reservation_time"
+        ), {"branch_id": branch_id, "day": day}).all())
+    engine.dispose()
+    return [
+        f"{label} {at}: counter {guests} guests, reservation rows {int(rows.get(at) or 0)}"
+        for at, guests in booked.items() if int(rows.get(at) or 0) != guests
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--attempts", type=int, default=500, help="Booking attempts per phase.")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--capacity", type=int, default=40, help="Guests per slot of the limited branch.")
+    parser.add_argument("--guests", type=int, default=2, help="Guests per booking.")
+    parser.add_argument("--username", default=SUPERUSER_USERNAME)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--database-url", help="Optional sync SQLAlchemy URL of the server's database for a row check.")
+    sys.exit(asyncio.run(main(parser.parse_args())))